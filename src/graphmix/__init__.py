@@ -1,8 +1,33 @@
 __version__ = "0.0.2"
 
-__all__ = ["ChemicalRegistry", "Solution", "Q_", "plot_graph"]
+__all__ = ["Q_", "ChemicalRegistry", "Solution", "plot_graph"]
 
-from graphmix.chemistry.service_layer.registry import ChemicalRegistry
-from graphmix.chemistry.units import Q_
-from graphmix.graph.drawing import plot_graph
-from graphmix.graph.solution import Solution
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from graphmix.chemistry.service_layer.registry import ChemicalRegistry
+    from graphmix.chemistry.units import Q_
+    from graphmix.graph.drawing import plot_graph
+    from graphmix.graph.solution import Solution
+
+_exports = {
+    "ChemicalRegistry": "graphmix.chemistry.service_layer.registry",
+    "Q_": "graphmix.chemistry.units",
+    "Solution": "graphmix.graph.solution",
+    "plot_graph": "graphmix.graph.drawing",
+}
+
+
+def __getattr__(name: str):
+    """Import public names on first access, so that importing graphmix does
+    not load matplotlib, sqlmodel or pint until they are needed."""
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_exports[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_exports])
@@ -1,6 +1,7 @@
 from sqlmodel import Session
 
 from graphmix.chemistry.chemical import Chemical
+from graphmix.chemistry.chemical import UnknownChemical
 from graphmix.core.sqlmodel.repository import SqlModelRepository
 
 
@@ -9,3 +10,10 @@ class ChemicalRepository(SqlModelRepository[Chemical]):
 
     def __init__(self, session: Session):
         super().__init__(self.model, session)
+
+
+class UnknownChemicalRepository(SqlModelRepository[UnknownChemical]):
+    model = UnknownChemical
+
+    def __init__(self, session: Session):
+        super().__init__(self.model, session)
@@ -34,11 +34,16 @@ class Quantity(TypeDecorator):
         return process
 
 
+def normalize_name(name: str) -> str:
+    """The form chemical names are stored and looked up in."""
+    return name.strip().lower()
+
+
 class Chemical(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True, repr=False)
-    name: str
-    formula: str
-    smiles: str | None = None
+    name: str = Field(unique=True, index=True)
+    formula: str = Field(index=True)
+    smiles: str | None = Field(default=None, index=True)
     molar_mass: MolarMass | str = Field(sa_type=Quantity)
 
     def count(self, element: str) -> int:
@@ -57,3 +62,10 @@ class Chemical(SQLModel, table=True):
 
     def __hash__(self):
         return hash(self.name)
+
+
+class UnknownChemical(SQLModel, table=True):
+    """A name PubChem did not know, and when it was last asked."""
+
+    name: str = Field(primary_key=True)
+    checked_at: float
@@ -1,8 +1,17 @@
+import asyncio
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from urllib.parse import quote
+
+from requests import HTTPError
 from requests_ratelimiter import LimiterSession
 
 from graphmix.chemistry.chemical import Chemical
 from graphmix.chemistry.units import Q_
 
+PUBCHEM_URI = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+
 
 def property_string() -> str:
     chemical_properties = (
@@ -16,19 +25,42 @@ def property_string() -> str:
 PROP_STRING = property_string()
 
 
-def pubchem_uri(name: str) -> str:
-    base = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+def pubchem_uri(name: str, base: str = PUBCHEM_URI) -> str:
     end = f"property/{PROP_STRING}/JSON"
-    return f"{base}/compound/name/{name}/{end}"
+    return f"{base}/compound/name/{quote(name, safe='')}/{end}"
+
+
+class NotFoundError(LookupError):
+    pass
+
+
+class BatchLookup(NamedTuple):
+    """
+    Result of a batch lookup: the chemicals found, and the error of each
+    name that could not be looked up, keyed by name.
+    """
+
+    chemicals: dict[str, Chemical]
+    errors: dict[str, Exception]
 
 
 class PubChemService:
     session: LimiterSession
     timeout: float = 5
+    base_uri: str = PUBCHEM_URI
+    max_concurrency: int = 4
 
-    def __init__(self, requests_per_second: float = 5, timeout: float = 5):
+    def __init__(
+        self,
+        requests_per_second: float = 5,
+        timeout: float = 5,
+        base_uri: str = PUBCHEM_URI,
+        max_concurrency: int = 4,
+    ):
         self.session = LimiterSession(per_second=requests_per_second)
         self.timeout = timeout
+        self.base_uri = base_uri.rstrip("/")
+        self.max_concurrency = max_concurrency
 
     def do_request(self, uri: str) -> dict:
         r = self.session.get(uri, timeout=self.timeout)
@@ -36,9 +68,14 @@ class PubChemService:
         return r.json()
 
     def lookup(self, name: str) -> Chemical:
-        uri = pubchem_uri(name)
+        uri = pubchem_uri(name, self.base_uri)
 
-        data = self.do_request(uri)
+        try:
+            data = self.do_request(uri)
+        except HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                raise NotFoundError(f"Chemical {name} not found") from e
+            raise
         properties = data["PropertyTable"]["Properties"][0]
         smiles = properties.get("CanonicalSMILES", None)
         formula = properties.get("MolecularFormula", None)
@@ -49,3 +86,45 @@ class PubChemService:
             formula=formula,
             molar_mass=molar_mass,
         )
+
+    async def lookup_many(self, names: Iterable[str]) -> BatchLookup:
+        """
+        Look up many names at once, with at most ``max_concurrency``
+        requests in flight. Requests share the session's rate limit, and a
+        name that fails is reported in ``errors`` without stopping the
+        others.
+        """
+        names = list(dict.fromkeys(names))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _lookup(name: str) -> Chemical:
+            async with semaphore:
+                return await asyncio.to_thread(self.lookup, name)
+
+        results = await asyncio.gather(
+            *(_lookup(name) for name in names), return_exceptions=True
+        )
+        batch = BatchLookup({}, {})
+        for name, result in zip(names, results, strict=True):
+            if isinstance(result, Exception):
+                batch.errors[name] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                batch.chemicals[name] = result
+        return batch
+
+    def lookup_all(self, names: Iterable[str]) -> BatchLookup:
+        """
+        Blocking version of ``lookup_many``. Inside a running event loop,
+        e.g. when called from a coroutine, the lookups run on an event loop
+        of their own in another thread.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.lookup_many(names))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(
+                asyncio.run, self.lookup_many(names)
+            ).result()
@@ -1,10 +1,18 @@
 import logging
+import time
+from collections.abc import Iterable
 from pathlib import Path
 
+from graphmix import config
 from graphmix.chemistry.chemical import Chemical
+from graphmix.chemistry.chemical import UnknownChemical
+from graphmix.chemistry.chemical import normalize_name
+from graphmix.chemistry.service_layer.pubchem import NotFoundError
 from graphmix.chemistry.service_layer.pubchem import PubChemService
+from graphmix.chemistry.service_layer.snapshot import ChemicalSnapshot
 from graphmix.chemistry.service_layer.unit_of_work import ChemicalUnitOfWork
 from graphmix.chemistry.service_layer.unit_of_work import session_factory
+from graphmix.core.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -13,51 +21,146 @@ class ChemicalRegistry:
     """
     A registry for storing and retrieving chemical information. Uses a local
     database to store chemicals, and queries PubChem if a chemical is not
-    found.
+    found. Chemicals that were looked up recently are kept in memory for
+    ``cache_ttl`` seconds.
+
+    Common chemicals are resolved from a bundled snapshot before asking
+    PubChem. Names PubChem does not know are remembered in the database and
+    not asked for again for ``unknown_ttl`` seconds. In ``offline`` mode,
+    which defaults to the ``GRAPHMIX_OFFLINE`` environment variable, only
+    the database and the snapshot are used.
     """
 
     uow: ChemicalUnitOfWork
     pubchem: PubChemService
+    cache: TTLCache[str, Chemical]
+    offline: bool
+    unknown_ttl: float | None
+    snapshot: ChemicalSnapshot
 
     def __init__(
         self,
         uow: ChemicalUnitOfWork | None = None,
         path: str | None = None,
+        cache_size: int = 1024,
+        cache_ttl: float | None = 3600,
+        pubchem: PubChemService | None = None,
+        offline: bool = config.OFFLINE,
+        unknown_ttl: float | None = 7 * 24 * 3600,
+        snapshot: ChemicalSnapshot | None = None,
     ):
         if uow is None:
             uow = ChemicalUnitOfWork(session_factory=session_factory(path))
         self.uow = uow
-        self.pubchem = PubChemService()
+        self.pubchem = PubChemService() if pubchem is None else pubchem
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.offline = offline
+        self.unknown_ttl = unknown_ttl
+        self.snapshot = ChemicalSnapshot() if snapshot is None else snapshot
 
     def get_chemical(self, name: str) -> Chemical:
         """
         Get a chemical by name. If the chemical is not found in the local
-        database, query PubChem for the chemical information.
+        database or the snapshot, query PubChem for the chemical
+        information.
         """
-        with self.uow:
-            chemical = self.uow.repo.get_by("name", name.lower())
-            if chemical is not None:
-                return chemical
-            logger.info(
-                f"Chemical {name} not found in local database, querying PubChem"
-            )
-            chemical = self.pubchem.lookup(name)
+        return self.get_chemicals([name])[name]
+
+    def get_chemicals(self, names: Iterable[str]) -> dict[str, Chemical]:
+        """
+        Get many chemicals by name, keyed by the names given. Cached
+        chemicals are returned directly, the others are read from the local
+        database in one query, and only those missing there are taken from
+        the snapshot or looked up on PubChem and stored together.
+        """
+        names = list(names)
+        found: dict[str, Chemical] = {}
+        missing = []
+        for key in dict.fromkeys(normalize_name(name) for name in names):
+            chemical = self.cache.get(key)
             if chemical is None:
-                logger.error(f"Chemical {name} not found in PubChem")
-                raise ValueError(f"Chemical {name} not found")
-            self.uow.repo.add(chemical)
-            self.uow.session.expunge(chemical)
-            self.uow.commit()
-            return chemical
+                missing.append(key)
+            else:
+                found[key] = chemical
+
+        if missing:
+            cached = set(found)
+            with self.uow:
+                for chemical in self.uow.repo.get_many_by("name", missing):
+                    self.uow.session.expunge(chemical)
+                    found[chemical.name] = chemical
+                missing = [key for key in missing if key not in found]
+                if missing:
+                    fetched = self._lookup(missing)
+                    for chemical in fetched:
+                        self.uow.repo.add(chemical)
+                    self.uow.commit()
+                    for chemical in fetched:
+                        self.uow.session.refresh(chemical)
+                        self.uow.session.expunge(chemical)
+                        found[chemical.name] = chemical
+            # hits keep the expiry they were stored with
+            for key, chemical in found.items():
+                if key not in cached:
+                    self.cache.set(key, chemical)
+
+        not_found = [
+            name for name in names if normalize_name(name) not in found
+        ]
+        if not_found:
+            logger.error("Chemicals %s not found", not_found)
+            raise ValueError(f"Chemical {', '.join(not_found)} not found")
+        return {name: found[normalize_name(name)] for name in names}
+
+    def _lookup(self, names: list[str]) -> list[Chemical]:
+        chemicals = []
+        remote = []
+        for name in names:
+            chemical = self.snapshot.get(name)
+            if chemical is None:
+                remote.append(name)
+            else:
+                chemicals.append(chemical)
+        if not remote or self.offline:
+            return chemicals
+
+        now = time.time()
+        known_unknown = {
+            miss.name
+            for miss in self.uow.unknown.get_many_by("name", remote)
+            if self.unknown_ttl is None
+            or now - miss.checked_at <= self.unknown_ttl
+        }
+        remote = [name for name in remote if name not in known_unknown]
+        if not remote:
+            return chemicals
+
+        logger.info(
+            "Chemicals %s not found in local database, querying PubChem",
+            remote,
+        )
+        batch = self.pubchem.lookup_all(remote)
+        for name, error in batch.errors.items():
+            if isinstance(error, NotFoundError):
+                self.uow.session.merge(
+                    UnknownChemical(name=name, checked_at=now)
+                )
+            else:
+                logger.warning("PubChem lookup of %s failed: %s", name, error)
+        for name, chemical in batch.chemicals.items():
+            chemical.name = name
+            chemicals.append(chemical)
+        return chemicals
 
     def add_chemical(self, chemical: Chemical):
         """
         Add a chemical to the local database.
         """
+        chemical.name = normalize_name(chemical.name)
+        self.cache.pop(chemical.name)
         with self.uow:
             if self.uow.repo.get_by("name", chemical.name) is not None:
                 raise ValueError(f"Chemical {chemical.name} already exists")
-            chemical.name = chemical.name.lower()
             self.uow.repo.add(chemical)
             self.uow.commit()
 
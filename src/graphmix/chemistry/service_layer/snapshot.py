@@ -0,0 +1,33 @@
+import functools
+import json
+from pathlib import Path
+
+from graphmix.chemistry.chemical import Chemical
+
+SNAPSHOT_PATH = Path(__file__).parent.parent / "data" / "chemicals.json"
+
+
+@functools.cache
+def _read_snapshot(path: Path) -> dict[str, dict]:
+    with path.open() as f:
+        return {row["name"].strip().lower(): row for row in json.load(f)}
+
+
+class ChemicalSnapshot:
+    """
+    Read-only set of chemicals shipped as JSON, used to resolve common
+    names without the network. Each lookup returns a new ``Chemical`` so
+    it can be added to a session.
+    """
+
+    path: Path
+
+    def __init__(self, path: str | Path = SNAPSHOT_PATH):
+        self.path = Path(path)
+
+    def __contains__(self, name: str) -> bool:
+        return name in _read_snapshot(self.path)
+
+    def get(self, name: str) -> Chemical | None:
+        row = _read_snapshot(self.path).get(name)
+        return None if row is None else Chemical(**{**row, "name": name})
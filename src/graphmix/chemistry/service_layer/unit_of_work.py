@@ -1,38 +1,158 @@
+import logging
 from pathlib import Path
 
+from sqlalchemy import Engine
+from sqlalchemy import String
+from sqlalchemy import bindparam
+from sqlalchemy import column
+from sqlalchemy import event
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import QueuePool
 from sqlmodel import Session
 from sqlmodel import SQLModel
 from sqlmodel import create_engine
 
 from graphmix import config
+from graphmix.chemistry.adapters.repository import UnknownChemicalRepository
 from graphmix.chemistry.chemical import Chemical
+from graphmix.chemistry.chemical import normalize_name
 from graphmix.core.sqlmodel.unit_of_work import SessionFactory
 from graphmix.core.sqlmodel.unit_of_work import SqlModelUnitOfWork
 from graphmix.core.util import get_app_dir
 
+logger = logging.getLogger(__name__)
+
 
 def db_path(db_name: str) -> Path:
     db_dir = get_app_dir(config.APP_NAME)
     return Path(db_dir) / db_name
 
 
-def session_factory(db_name: str | Path | None = None) -> SessionFactory:
+# applied to every new connection; WAL lets readers run alongside a writer
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 30_000,
+    "cache_size": -16_000,
+    "temp_store": "MEMORY",
+    "mmap_size": 64 * 1024 * 1024,
+}
+
+
+def _set_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+    cursor.close()
+
+
+def _normalize_names(engine: Engine):
+    """
+    Store the names of an existing database in normalized form, as the
+    registry looks them up, dropping chemicals that repeat an earlier one
+    under a name that only differs in case or surrounding spaces. Raises
+    ``ValueError``, and changes nothing, if such chemicals are not the same.
+    """
+    table = Chemical.__table__
+    # molar masses are compared as stored
+    columns = (table.c.formula, table.c.smiles, column("molar_mass", String))
+    with engine.begin() as connection:
+        rows = connection.execute(
+            select(table.c.id, table.c.name, *columns).order_by(table.c.id)
+        ).all()
+        kept: dict[str, tuple] = {}
+        duplicates, renamed, conflicts = [], [], []
+        for id_, name, *fields in rows:
+            normalized = normalize_name(name)
+            if normalized in kept:
+                first, first_fields = kept[normalized]
+                if fields != first_fields:
+                    conflicts.append(f"{first!r} and {name!r}")
+                duplicates.append((id_, name, first))
+                continue
+            kept[normalized] = (name, fields)
+            if normalized != name:
+                renamed.append(
+                    {"row_id": id_, "name": name, "normalized": normalized}
+                )
+        if conflicts:
+            raise ValueError(
+                "Cannot normalize the chemical names of "
+                f"{engine.url.database}: {', '.join(conflicts)} differ. "
+                "Remove or rename one of each before connecting."
+            )
+        for _, name, first in duplicates:
+            logger.warning("Dropping chemical %r, a copy of %r", name, first)
+        for row in renamed:
+            logger.warning(
+                "Renaming chemical %r to %r", row["name"], row["normalized"]
+            )
+        if duplicates:
+            connection.execute(
+                table.delete().where(
+                    table.c.id.in_([id_ for id_, _, _ in duplicates])
+                )
+            )
+        if renamed:
+            connection.execute(
+                table.update()
+                .where(table.c.id == bindparam("row_id"))
+                .values(name=bindparam("normalized")),
+                renamed,
+            )
+
+
+def _create_indexes(engine: Engine):
+    """Add the chemical indexes declared since a database was created."""
+    table = Chemical.__table__
+    existing = {
+        index["name"] for index in inspect(engine).get_indexes(table.name)
+    }
+    missing = [index for index in table.indexes if index.name not in existing]
+    if not missing:
+        return
+    _normalize_names(engine)
+    for index in missing:
+        try:
+            index.create(engine, checkfirst=True)
+        except IntegrityError:
+            logger.warning(
+                "Could not create index %s: %s has duplicate rows",
+                index.name,
+                table.name,
+            )
+
+
+def session_factory(
+    db_name: str | Path | None = None,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+) -> SessionFactory:
     if db_name is None:
         path = db_path(config.DB_NAME)
     else:
         path = Path(db_name)
 
     sqlite_path = f"sqlite:///{path}"
-    needs_metadata = False
     if not Path.exists(path):
-        needs_metadata = True
         path.parent.mkdir(parents=True, exist_ok=True)
         path.touch()
 
-    engine = create_engine(sqlite_path, echo=False)
-    # if the file does not exist, create the metadata
-    if needs_metadata:
-        SQLModel.metadata.create_all(engine)
+    engine = create_engine(
+        sqlite_path,
+        echo=False,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    event.listen(engine, "connect", _set_pragmas)
+    # creates the tables of a new database, and tables added since an
+    # existing one was created
+    SQLModel.metadata.create_all(engine)
+    _create_indexes(engine)
 
     def _factory():
         return Session(engine)
@@ -42,3 +162,9 @@ def session_factory(db_name: str | Path | None = None) -> SessionFactory:
 
 class ChemicalUnitOfWork(SqlModelUnitOfWork):
     model = Chemical
+    unknown: UnknownChemicalRepository
+
+    def __enter__(self) -> Session:
+        session = super().__enter__()
+        self.unknown = UnknownChemicalRepository(self.session)
+        return session
@@ -1,8 +1,12 @@
+import functools
+import os
 from decimal import Decimal
 from typing import Annotated
 from typing import Any
 
 import pint
+from pint.util import ParserHelper
+from pint.util import UnitsContainer
 from pydantic import GetCoreSchemaHandler
 from pydantic import GetJsonSchemaHandler
 from pydantic.json_schema import JsonSchemaValue
@@ -11,13 +15,59 @@ from pydantic_core import core_schema
 
 from graphmix.core.util import StrEnum
 
-ureg = pint.UnitRegistry()
+UNITS_CACHE_FOLDER = os.environ.get("GRAPHMIX_UNITS_CACHE") or None
+"""Where pint caches its parsed definitions. Nothing is cached unless
+GRAPHMIX_UNITS_CACHE is set, to a folder or to ``:auto:`` for pint's user
+cache folder."""
+
+
+def _create_registry(
+    cache_folder: str | None = UNITS_CACHE_FOLDER,
+) -> pint.UnitRegistry:
+    if cache_folder is None:
+        return pint.UnitRegistry()
+    try:
+        return pint.UnitRegistry(cache_folder=cache_folder)
+    except OSError:
+        return pint.UnitRegistry()
+
+
+ureg = _create_registry()
 ureg.formatter.default_format = "P~"
 
+_PERCENT = ureg.percent._units
+
+
+@functools.cache
+def parse_units(units: str) -> pint.Unit:
+    """Parse a unit string once; later calls return the same Unit."""
+    return ureg.Unit(units)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_quantity(text: str) -> tuple[Any, UnitsContainer]:
+    q = ureg.Quantity(text)
+    return q.magnitude, q._units
+
+
+def parse_quantity(value: int | float | str | Decimal) -> ureg.Quantity:
+    """A new Quantity from ``value``, parsing each distinct string once."""
+    if isinstance(value, str):
+        magnitude, units = _parse_quantity(value)
+        return ureg.Quantity(magnitude, units)
+    return ureg.Quantity(value)
+
 
+@functools.cache
 def dimensionality_validator(
     dimensionality: str | None = None, default_unit: str | None = None
 ):
+    """
+    Pydantic annotation validating that a quantity has ``dimensionality``.
+    Annotations are cached per arguments, the dimensionality is parsed once,
+    and units that passed validation are remembered so later quantities with
+    the same units are accepted without comparing dimensions.
+    """
 
     if dimensionality is None:
 
@@ -25,28 +75,30 @@ def dimensionality_validator(
             return value
 
     else:
+        expected = UnitsContainer(ParserHelper.from_string(dimensionality))
+        accepted = {_PERCENT}
 
         def validator_func(value: ureg.Quantity) -> ureg.Quantity:
-            if (
-                value.units.dimensionality != dimensionality
-                and value.units != "percent"
-            ):
+            units = value._units
+            if units in accepted:
+                return value
+            if value.dimensionality != expected:
                 raise ValueError(
                     f"Expected a quantity with dimensionality {dimensionality}, but got {value.dimensionality}."
                 )
+            accepted.add(units)
             return value
 
     if default_unit is None:
-
-        def convert_func(value: int | float | str | Decimal) -> ureg.Quantity:
-            return ureg.Quantity(value)
+        convert_func = parse_quantity
 
     else:
+        default = parse_units(default_unit)
 
         def convert_func(value: int | float | str | Decimal) -> ureg.Quantity:
-            q = ureg.Quantity(value)
-            if q.units == "":
-                q = Quantity(q.magnitude, default_unit)
+            q = parse_quantity(value)
+            if not q._units:
+                q = ureg.Quantity(q.magnitude, default)
             return q
 
     class _QuantityPydanticAnnotation:
@@ -131,6 +183,8 @@ mmol = ureg.mmol
 mM = ureg.mM
 percent = ureg.percent
 g = ureg.g
+dimensionless = ureg.dimensionless
+uL_per_s = ureg.uL / ureg.s
 
 
 class Dimensionality(StrEnum):
@@ -142,18 +196,26 @@ class Dimensionality(StrEnum):
     Volume = "[length] ** 3"
     Percent = "dimensionless"
     FlowRate = "[length] ** 3 / [time]"
+    Time = "[time]"
+    Length = "[length]"
+    Speed = "[length] / [time]"
+
+
+@functools.cache
+def _dim_quantity(item: str | Dimensionality | tuple[Dimensionality, str]):
+    if isinstance(item, tuple):
+        validator = dimensionality_validator(item[0], item[1])
+    else:
+        validator = dimensionality_validator(item)
+
+    return Annotated[ureg.Quantity, validator]
 
 
 class DimQuantity(Quantity):
     def __class_getitem__(
         cls, item: str | Dimensionality | tuple[Dimensionality, str]
     ):
-        if isinstance(item, tuple):
-            validator = dimensionality_validator(item[0], item[1])
-        else:
-            validator = dimensionality_validator(item)
-
-        return Annotated[ureg.Quantity, validator]
+        return _dim_quantity(item)
 
 
 Mass = DimQuantity[Dimensionality.Mass, "g"]
@@ -182,3 +244,12 @@ Concentration = MolarConcentration | MassConcentration
 
 FlowRate = DimQuantity[Dimensionality.FlowRate, "mL/min"]
 """A Quantity that must have a flow rate unit."""
+
+Time = DimQuantity[Dimensionality.Time, "s"]
+"""A Quantity that must have a time unit."""
+
+Length = DimQuantity[Dimensionality.Length, "mm"]
+"""A Quantity that must have a length unit."""
+
+Speed = DimQuantity[Dimensionality.Speed, "mm/s"]
+"""A Quantity that must have a speed unit."""
@@ -1,2 +1,5 @@
+import os
+
 APP_NAME = "graphmix"
 DB_NAME = APP_NAME + ".db"
+OFFLINE = os.environ.get("GRAPHMIX_OFFLINE", "") not in ("", "0")
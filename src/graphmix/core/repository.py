@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from collections.abc import Iterable
 from collections.abc import Iterator
 from typing import Any
 from typing import Generic
@@ -30,6 +31,13 @@ class AbstractRepository(Generic[T]):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def get_many_by(self, field: str, values: Iterable[Any]) -> list[T]:
+        """
+        Gets every item whose field is one of values
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def list(self) -> list[T]:
         """
@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 from collections.abc import Iterator
 from typing import Any
 from typing import Generic
@@ -31,6 +32,23 @@ class SqlModelRepository(Generic[T], AbstractRepository[T]):
         )
         return self.session.exec(statement).first()
 
+    def get_many_by(
+        self, field: str, values: Iterable[Any], batch_size: int = 500
+    ) -> list[T]:
+        """
+        Items whose field is in values, fetched with one IN query per
+        ``batch_size`` values to stay below SQLite's parameter limit.
+        """
+        column = getattr(self.model, field)
+        values = list(dict.fromkeys(values))
+        items = []
+        for start in range(0, len(values), batch_size):
+            statement = select(self.model).where(
+                column.in_(values[start : start + batch_size])
+            )
+            items.extend(self.session.exec(statement).all())
+        return items
+
     def list(self) -> list[T]:
         statement = select(self.model)
         return self.session.exec(statement).all()
@@ -1,16 +1,77 @@
+from __future__ import annotations
+
 from collections.abc import Generator
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
 
 import networkx as nx
+import numpy as np
 
 from graphmix.chemistry.units import Volume
 from graphmix.graph.model import DiGraph
 
+if TYPE_CHECKING:
+    from scipy import sparse
+
 
 def reverse_topological_sort(G: DiGraph) -> Generator[str, None, None]:
     """Reverse topological sort of the graph."""
     yield from reversed(tuple(nx.topological_sort(G)))
 
 
+def ancestor_cone(G: DiGraph, nodes: Iterable[str]) -> set[str]:
+    """The given nodes together with all of their ancestors."""
+    cone = set()
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if node in cone or node not in G:
+            continue
+        cone.add(node)
+        stack.extend(G.predecessors(node))
+    return cone
+
+
+def weight_matrix(G: DiGraph, nodes: Iterable[str]) -> sparse.csr_matrix:
+    """
+    Sparse matrix of the ``weight`` attribute of the edges of ``G``, where
+    entry ``(i, j)`` is the weight of the edge from ``nodes[i]`` to
+    ``nodes[j]``.
+    """
+    # scipy.sparse is imported on first use, as it is slow to import
+    from scipy import sparse  # noqa: PLC0415
+
+    index = {n: i for i, n in enumerate(nodes)}
+    rows, cols, data = [], [], []
+    for u, v, weight in G.edges(data="weight", default=0):
+        rows.append(index[u])
+        cols.append(index[v])
+        data.append(weight)
+    return sparse.csr_matrix(
+        (data, (rows, cols)), shape=(len(index), len(index)), dtype=float
+    )
+
+
+def total_volumes(
+    G: DiGraph, nodes: tuple[str, ...], final_volumes: np.ndarray
+) -> np.ndarray:
+    """
+    Volume each node has to hold: its final volume plus everything that is
+    transferred out of it. Solves ``(I - W) t = f`` for ``t``; ``nodes`` must
+    be in topological order so that the system is upper triangular.
+    """
+    if not nodes:
+        return np.zeros(0)
+    from scipy import sparse  # noqa: PLC0415
+    from scipy.sparse.linalg import spsolve_triangular  # noqa: PLC0415
+
+    w = weight_matrix(G, nodes)
+    a = sparse.identity(len(nodes), format="csr") - w
+    return spsolve_triangular(
+        a, final_volumes, lower=False, unit_diagonal=True
+    )
+
+
 def edge_volume(
     G: DiGraph,
     source: str,
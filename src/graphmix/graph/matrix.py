@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import networkx as nx
+import numpy as np
+import pint
+
+from graphmix.chemistry.chemical import Chemical
+from graphmix.chemistry.units import ureg
+from graphmix.graph.analysis import weight_matrix
+from graphmix.graph.model import DiGraph
+from graphmix.graph.solution import Composition
+from graphmix.graph.solution import DimensionalityError
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+_MASS = ureg.Quantity(1, "mg/mL").dimensionality
+_MOLAR = ureg.Quantity(1, "mol/L").dimensionality
+
+
+class CompositionMatrix:
+    """
+    Concentration of every chemical in every node of a protocol. Rows follow
+    ``nodes`` and columns follow ``chemicals``; every column has a single unit
+    given by ``units``.
+    """
+
+    nodes: tuple[str, ...]
+    chemicals: tuple[Chemical, ...]
+    units: tuple[pint.Unit, ...]
+    magnitudes: np.ndarray | sparse.csr_array
+
+    def __init__(
+        self,
+        nodes: tuple[str, ...],
+        chemicals: tuple[Chemical, ...],
+        units: tuple[pint.Unit, ...],
+        magnitudes: np.ndarray | sparse.csr_array,
+    ):
+        self.nodes = nodes
+        self.chemicals = chemicals
+        self.units = units
+        self.magnitudes = magnitudes
+        self._node_index = {n: i for i, n in enumerate(nodes)}
+        self._chem_index = {c.name: i for i, c in enumerate(chemicals)}
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.magnitudes.shape
+
+    def _column_index(self, chem: Chemical | str) -> int:
+        if isinstance(chem, Chemical):
+            chem = chem.name
+        return self._chem_index[chem]
+
+    def column(self, chem: Chemical | str) -> ureg.Quantity:
+        """Concentrations of ``chem`` in every node as a Quantity array."""
+        j = self._column_index(chem)
+        values = self.magnitudes[:, [j]]
+        if hasattr(values, "toarray"):
+            values = values.toarray()
+        return ureg.Quantity(np.ravel(values), self.units[j])
+
+    def of(self, node: str, chem: Chemical | str) -> ureg.Quantity:
+        j = self._column_index(chem)
+        value = self.magnitudes[self._node_index[node], j]
+        return ureg.Quantity(float(value), self.units[j])
+
+    def to_quantities(self) -> dict[str, ureg.Quantity]:
+        """One Quantity array per chemical, keyed by chemical name."""
+        return {c.name: self.column(c) for c in self.chemicals}
+
+
+def _magnitude(value: ureg.Quantity, unit: pint.Unit, chem: Chemical) -> float:
+    """
+    Magnitude of ``value`` in ``unit``, converting between mass and molar
+    concentrations with the molar mass of ``chem``.
+    """
+    got, expected = value.dimensionality, unit.dimensionality
+    if got != expected:
+        if got == _MOLAR and expected == _MASS:
+            value = value * chem.molar_mass
+        elif got == _MASS and expected == _MOLAR:
+            value = value / chem.molar_mass
+        else:
+            raise DimensionalityError(str(expected), chem.name, str(got))
+    return value.m_as(unit)
+
+
+def composition_matrix(
+    G: DiGraph,
+    inputs: dict[str, Composition],
+    as_sparse: bool = False,
+) -> CompositionMatrix:
+    """
+    Solve the mixing system ``(I - W^T) C = B`` over the edge weights of
+    ``G``, where ``B`` holds the compositions of the ``inputs``. Nodes are
+    ordered topologically, so the system is lower triangular and is solved by
+    forward substitution.
+    """
+    from scipy import sparse  # noqa: PLC0415
+    from scipy.sparse.linalg import spsolve  # noqa: PLC0415
+    from scipy.sparse.linalg import spsolve_triangular  # noqa: PLC0415
+
+    nodes = tuple(nx.topological_sort(G))
+    chemicals: dict[str, Chemical] = {}
+    units: dict[str, pint.Unit] = {}
+    for composition in inputs.values():
+        for chem, value in composition.all.items():
+            if chem.name not in chemicals:
+                chemicals[chem.name] = chem
+                units[chem.name] = value.units
+    chem_index = {name: j for j, name in enumerate(chemicals)}
+
+    rows, cols, data = [], [], []
+    for i, node in enumerate(nodes):
+        composition = inputs.get(node)
+        if composition is None:
+            continue
+        for chem, value in composition.all.items():
+            rows.append(i)
+            cols.append(chem_index[chem.name])
+            data.append(_magnitude(value, units[chem.name], chem))
+    shape = (len(nodes), len(chemicals))
+    b = sparse.coo_array((data, (rows, cols)), shape=shape, dtype=float)
+
+    w = weight_matrix(G, nodes)
+    a = sparse.identity(len(nodes), format="csr") - w.T.tocsr()
+    if not (nodes and chemicals):
+        c = b.tocsr() if as_sparse else b.toarray()
+    elif as_sparse:
+        # spsolve returns a dense vector for a single right-hand side
+        c = spsolve(a.tocsc(), b.tocsc())
+        c = sparse.csr_array(c if sparse.issparse(c) else np.reshape(c, shape))
+    else:
+        c = spsolve_triangular(a, b.toarray(), lower=True, unit_diagonal=True)
+    return CompositionMatrix(
+        nodes=nodes,
+        chemicals=tuple(chemicals.values()),
+        units=tuple(units.values()),
+        magnitudes=c,
+    )
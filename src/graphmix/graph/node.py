@@ -1,8 +1,8 @@
 from pydantic import BaseModel
 
-from graphmix import Solution
 from graphmix.chemistry.chemical import Chemical
 from graphmix.chemistry.units import Volume
+from graphmix.graph.solution import Solution
 from graphmix.location import Location
 
 
@@ -1,8 +1,16 @@
+import math
 from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Mapping
+from typing import Any
+from typing import Literal
 
 import networkx as nx
+import numpy as np
 from pydantic import BaseModel
 from pydantic import Field
+from pydantic import PrivateAttr
+from pydantic import TypeAdapter
 
 from graphmix.chemistry.chemical import Chemical
 from graphmix.chemistry.dilution import dilution
@@ -10,8 +18,15 @@ from graphmix.chemistry.units import Q_
 from graphmix.chemistry.units import Concentration
 from graphmix.chemistry.units import Percent
 from graphmix.chemistry.units import Volume
+from graphmix.chemistry.units import dimensionless
+from graphmix.chemistry.units import uL
+from graphmix.chemistry.units import ureg
+from graphmix.graph.analysis import ancestor_cone
 from graphmix.graph.analysis import edge_volume
 from graphmix.graph.analysis import reverse_topological_sort
+from graphmix.graph.analysis import total_volumes
+from graphmix.graph.matrix import CompositionMatrix
+from graphmix.graph.matrix import composition_matrix
 from graphmix.graph.model import DiGraph
 from graphmix.graph.node import Node
 from graphmix.graph.solution import Solution
@@ -19,6 +34,25 @@ from graphmix.location import Location
 from graphmix.location import LocationSet
 
 
+class NodeRecord(BaseModel):
+    """
+    One node of a batch insertion: a solution named ``name`` mixed from the
+    named protocol nodes in ``components``.
+    """
+
+    name: str
+    components: dict[str, Percent]
+    final_volume: Volume
+    into: str | None = None
+
+
+_node_records = TypeAdapter(list[NodeRecord])
+
+
+def _at_least(volume: float, minimum: float) -> bool:
+    return volume >= minimum or math.isclose(volume, minimum)
+
+
 class Protocol(BaseModel):
     grids: dict[str, LocationSet] = {}
     nodes: dict[str, Node] = {}
@@ -26,6 +60,9 @@ class Protocol(BaseModel):
     G: DiGraph = Field(default_factory=DiGraph)
     initial_volumes: dict[str, Volume] = {}
     outgoing_volumes: dict[str, Volume] = {}
+    overheads: dict[str, Volume] = {}
+    _dirty: set[str] = PrivateAttr(default_factory=set)
+    _totals: dict[str, float] = PrivateAttr(default_factory=dict)
 
     def with_node(
         self,
@@ -51,6 +88,8 @@ class Protocol(BaseModel):
             yield self.nodes[n]
 
     def _update_volumes(self):
+        for name in self.outgoing_volumes:
+            self.outgoing_volumes[name] = self.overheads.get(name, Q_(0, uL))
         for node in self.reverse_topo_nodes:
             if len(self.G.in_edges(node.name)) == 0:
                 self.initial_volumes[node.name] = (
@@ -68,6 +107,68 @@ class Protocol(BaseModel):
                 self.outgoing_volumes[u] += vol
                 self.G.edges[u, v]["volume"] = vol
 
+    def mark_dirty(self, node: Node | Solution | str) -> "Protocol":
+        """
+        Mark a node whose final volume was changed in place so that the next
+        call to ``solve`` recomputes it and its ancestors.
+        """
+        self._dirty.add(self.get_node(node).name)
+        return self
+
+    def _overhead(self, name: str) -> float:
+        overhead = self.overheads.get(name)
+        return 0.0 if overhead is None else overhead.m_as(uL)
+
+    def with_overhead(self, overheads: Mapping[str, Volume]) -> "Protocol":
+        """
+        Set the volume aspirated from each named node beyond what it
+        transfers, such as the dead and excess volume of multi-dispenses
+        (see ``graphmix.liquid_handling.scheduler.source_overhead``). The
+        next ``solve`` counts it as outgoing volume, so the node is prepared
+        with enough liquid.
+        """
+        for name, volume in overheads.items():
+            self.overheads[self.get_node(name).name] = volume
+            self._dirty.add(name)
+        return self
+
+    def _store_volumes(self, name: str, total: float, final: float):
+        self._totals[name] = total
+        self.outgoing_volumes[name] = Q_(total - final, uL)
+        if self.G.in_degree(name) == 0:
+            self.initial_volumes[name] = Q_(total, uL)
+        else:
+            self.initial_volumes[name] = Q_(0, uL)
+
+    def _update_all_volume_magnitudes(self):
+        nodes = tuple(nx.topological_sort(self.G))
+        final = np.array(
+            [self.nodes[n].final_volume.m_as(uL) for n in nodes], dtype=float
+        )
+        overhead = np.array([self._overhead(n) for n in nodes], dtype=float)
+        total = total_volumes(self.G, nodes, final + overhead)
+        index = {n: i for i, n in enumerate(nodes)}
+        self._totals = {}
+        for n, t, f in zip(nodes, total.tolist(), final.tolist(), strict=True):
+            self._store_volumes(n, t, f)
+        for u, v, weight in self.G.edges(data="weight"):
+            self.G.edges[u, v]["volume"] = Q_(weight * total[index[v]], uL)
+
+    def _update_volume_magnitudes(self):
+        cone = ancestor_cone(self.G, self._dirty)
+        if not self._totals or 2 * len(cone) > len(self.G):
+            self._update_all_volume_magnitudes()
+        else:
+            for n in reverse_topological_sort(self.G.subgraph(cone)):
+                final = self.nodes[n].final_volume.m_as(uL)
+                total = final + self._overhead(n)
+                for _, s, weight in self.G.out_edges(n, data="weight"):
+                    volume = weight * self._totals[s]
+                    self.G.edges[n, s]["volume"] = Q_(volume, uL)
+                    total += volume
+                self._store_volumes(n, total, final)
+        self._dirty.clear()
+
     def with_edge(
         self, source: str | Solution, target: str | Solution, weight: Percent
     ) -> "Protocol":
@@ -80,15 +181,17 @@ class Protocol(BaseModel):
         self.nodes[node.name] = node
         self.G.add_node(node.name)
         self.chemicals.update(dict(node.solution.chemicals))
-        self.initial_volumes[node.name] = Q_(0, "uL")
-        self.outgoing_volumes[node.name] = Q_(0, "uL")
+        self.initial_volumes[node.name] = Q_(0, uL)
+        self.outgoing_volumes[node.name] = Q_(0, uL)
+        self._dirty.add(node.name)
         return self
 
     def add_edge(
         self, source: Node, target: Node, weight: Percent
     ) -> "Protocol":
-        as_prop = weight.to("dimensionless").magnitude
+        as_prop = weight.m_as(dimensionless)
         self.G.add_edge(source.name, target.name, weight=as_prop)
+        self._dirty.update((source.name, target.name))
         return self
 
     def get_node(self, n: Node | Solution | str) -> Node:
@@ -129,6 +232,71 @@ class Protocol(BaseModel):
             )
         return self
 
+    def with_nodes_from(
+        self,
+        records: Iterable[NodeRecord | Mapping[str, Any]],
+        into: LocationSet | str | None = None,
+    ) -> "Protocol":
+        """
+        Add many nodes at once, each mixed from existing nodes or from nodes
+        earlier in ``records``. Records are validated in a single pass,
+        locations are taken from each grid as one block, and nodes and edges
+        are inserted into the graph in bulk. A table can be passed as
+        ``DataFrame.to_dict("records")``.
+
+        ``into`` is the grid used by records that do not name their own.
+        """
+        records = _node_records.validate_python(list(records))
+        if isinstance(into, str):
+            into = self.grids[into]
+
+        by_grid: dict[str, list[NodeRecord]] = {}
+        for record in records:
+            if record.into is None and into is None:
+                raise ValueError(f"No grid given for node {record.name}")
+            by_grid.setdefault(record.into, []).append(record)
+        locations: dict[str, Location] = {}
+        for grid, grid_records in by_grid.items():
+            location_set = into if grid is None else self.grids[grid]
+            taken = location_set.take(len(grid_records))
+            for record, location in zip(grid_records, taken, strict=True):
+                locations[record.name] = location
+
+        new_nodes: dict[str, Node] = {}
+        edges = []
+        for record in records:
+            sources = {
+                name: (
+                    new_nodes[name] if name in new_nodes else self.nodes[name]
+                )
+                for name in record.components
+            }
+            solution = Solution(name=record.name).with_components(
+                {
+                    sources[name].solution: percent
+                    for name, percent in record.components.items()
+                }
+            )
+            new_nodes[record.name] = Node.model_construct(
+                solution=solution,
+                location=locations[record.name],
+                final_volume=record.final_volume,
+            )
+            edges.extend(
+                (name, record.name, {"weight": percent.m_as(dimensionless)})
+                for name, percent in record.components.items()
+            )
+
+        self.nodes.update(new_nodes)
+        self.G.add_nodes_from(new_nodes)
+        self.G.add_edges_from(edges)
+        for name in new_nodes:
+            self.initial_volumes[name] = Q_(0, uL)
+            self.outgoing_volumes[name] = Q_(0, uL)
+        self._dirty.update(new_nodes)
+        self._dirty.update(u for u, _, _ in edges)
+        return self
+
     def with_dilution(
         self,
         species: Chemical | str,
@@ -148,9 +316,7 @@ class Protocol(BaseModel):
             v2=final_volume,
             c2=final_concentration,
         )
-        dilution_factor = (
-            (final_concentration / c1).to("dimensionless").magnitude
-        )
+        dilution_factor = (final_concentration / c1).m_as(dimensionless)
         dil = self.get_node(diluent).solution
         solution = source_node.solution.dilute_with(
             name=name,
@@ -158,8 +324,8 @@ class Protocol(BaseModel):
             ratio=dilution_factor,
         )
 
-        weight = Percent(v1 / final_volume, "%")
-        diluent_weight = Percent(100, "%") - weight
+        weight = (v1 / final_volume).to(ureg.percent)
+        diluent_weight = Q_(100, ureg.percent) - weight
         if isinstance(into, str):
             into = self.grids[into]
         position = next(into)
@@ -182,6 +348,141 @@ class Protocol(BaseModel):
         )
         return self
 
+    def _small_transfers(self, minimum: float) -> list[tuple[str, str, float]]:
+        small = []
+        for u, v, volume in self.G.edges(data="volume"):
+            magnitude = volume.m_as(uL)
+            if 0 < magnitude and not _at_least(magnitude, minimum):
+                small.append((u, v, magnitude))
+        return small
+
+    def _intermediate_name(
+        self, source: str, diluent: str, fraction: float
+    ) -> str:
+        # the label rounds the fraction, so an existing intermediate is only
+        # shared when its edge weights match the exact fraction
+        label = f"{source} d/ {diluent} ({100 * fraction:.3g}%)"
+        name, n = label, 1
+        while name in self.nodes:
+            if (
+                self.G.has_edge(source, name)
+                and self.G.has_edge(diluent, name)
+                and math.isclose(
+                    self.G.edges[source, name]["weight"], fraction
+                )
+                and math.isclose(
+                    self.G.edges[diluent, name]["weight"], 1 - fraction
+                )
+            ):
+                break
+            n += 1
+            name = f"{label} #{n}"
+        return name
+
+    def _insert_dilution(
+        self,
+        source: str,
+        target: str,
+        volume: float,
+        minimum: float,
+        maximum: float,
+        into: LocationSet,
+    ):
+        diluents = sorted(
+            (
+                (u, self.G.edges[u, target]["volume"].m_as(uL))
+                for u, _ in self.G.in_edges(target)
+                if u != source
+            ),
+            key=lambda d: d[1],
+            reverse=True,
+        )
+        if not diluents:
+            raise ValueError(
+                f"Transfer of {volume} uL from {source} to {target} is below "
+                f"the minimum and {target} has no diluent to dilute it with."
+            )
+        diluent, diluent_volume = diluents[0]
+
+        fraction = min(
+            max(volume / minimum, minimum / maximum), 1 - minimum / maximum
+        )
+        name = self._intermediate_name(source, diluent, fraction)
+        intermediate_volume = volume / fraction
+        remaining = diluent_volume - intermediate_volume * (1 - fraction)
+        if remaining < 0 or (
+            remaining > 1e-9 and not _at_least(remaining, minimum)
+        ):
+            raise ValueError(
+                f"Cannot dilute the transfer from {source} to {target}: "
+                f"{diluent} only contributes {diluent_volume} uL."
+            )
+
+        if name not in self.nodes:
+            total = max(minimum / fraction, minimum / (1 - fraction))
+            solution = self.nodes[source].solution.dilute_with(
+                self.nodes[diluent].solution, fraction, name=name
+            )
+            self.with_node(
+                entity=solution,
+                volume=Q_(total - intermediate_volume, uL),
+                into=into,
+            )
+            self.add_edge(
+                self.nodes[source],
+                self.nodes[name],
+                Q_(100 * fraction, ureg.percent),
+            )
+            self.add_edge(
+                self.nodes[diluent],
+                self.nodes[name],
+                Q_(100 * (1 - fraction), ureg.percent),
+            )
+
+        target_total = self._totals[target]
+        self.G.remove_edge(source, target)
+        if remaining > 1e-9:
+            self.G.edges[diluent, target]["weight"] = remaining / target_total
+        else:
+            self.G.remove_edge(diluent, target)
+        self.G.add_edge(
+            name, target, weight=intermediate_volume / target_total
+        )
+        self._dirty.update((source, diluent, name, target))
+
+    def with_intermediate_dilutions(
+        self,
+        min_volume: Volume,
+        into: LocationSet | str,
+        max_volume: Volume | None = None,
+    ) -> "Protocol":
+        """
+        Rewrite every transfer below ``min_volume`` to go through an
+        intermediate dilution of its source with the largest other component
+        of the target, placed in ``into``. When a single intermediate would
+        exceed ``max_volume`` (by default the max volume of ``into``), the
+        dilution is done in several steps. Intermediates of the same source,
+        diluent and ratio are shared. The protocol is solved on return.
+        """
+        if isinstance(into, str):
+            into = self.grids[into]
+        if max_volume is None:
+            max_volume = into.max_volume
+        minimum = min_volume.m_as(uL)
+        maximum = math.inf if max_volume is None else max_volume.m_as(uL)
+        if maximum < 2 * minimum:
+            raise ValueError(
+                "The max volume has to hold at least two minimum transfers."
+            )
+        self.solve()
+        while small := self._small_transfers(minimum):
+            source, target, volume = small[0]
+            self._insert_dilution(
+                source, target, volume, minimum, maximum, into
+            )
+            self.solve()
+        return self
+
     @property
     def edges(self):
         return self.G.edges
@@ -201,6 +502,28 @@ class Protocol(BaseModel):
             self.get_node(n) for n, deg in self.G.out_degree if not deg
         )
 
-    def solve(self) -> "Protocol":
-        self._update_volumes()
+    def composition_matrix(self, as_sparse: bool = False) -> CompositionMatrix:
+        """
+        Concentrations of every chemical in every node, computed in one
+        linear solve from the compositions of the inputs and the edge weights.
+        """
+        inputs = {node.name: node.solution.composition for node in self.inputs}
+        return composition_matrix(self.G, inputs, as_sparse=as_sparse)
+
+    def solve(
+        self, method: Literal["magnitude", "quantity"] = "magnitude"
+    ) -> "Protocol":
+        """
+        Compute the volume of every transfer and the initial volume of every
+        input. The ``magnitude`` method works on microliter floats and only
+        converts to quantities at the end; ``quantity`` does the arithmetic on
+        quantities edge by edge.
+        """
+        match method:
+            case "magnitude":
+                self._update_volume_magnitudes()
+            case "quantity":
+                self._update_volumes()
+            case _:
+                raise ValueError(f"Unknown solve method: {method}")
         return self
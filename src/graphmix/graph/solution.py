@@ -1,17 +1,24 @@
 from __future__ import annotations
 
+import weakref
 from collections.abc import Callable
 from collections.abc import Generator
+from typing import Annotated
+from typing import Any
 
 import networkx as nx
 from pydantic import BaseModel
+from pydantic import Discriminator
 from pydantic import Field
+from pydantic import PrivateAttr
+from pydantic import Tag
 
 from graphmix.chemistry.chemical import Chemical
 from graphmix.chemistry.units import Q_
 from graphmix.chemistry.units import MassConcentration
 from graphmix.chemistry.units import MolarConcentration
 from graphmix.chemistry.units import Percent
+from graphmix.chemistry.units import percent
 from graphmix.graph.model import DiGraph
 
 
@@ -86,7 +93,14 @@ class Composition(BaseModel):
 class Solution(BaseModel):
     name: str
     G: DiGraph = Field(default_factory=DiGraph, frozen=False)
-    components: dict[str, Chemical | Solution] = {}
+    components: dict[str, Component] = {}
+    _composition: Composition | None = PrivateAttr(default=None)
+    _leaf_amounts: dict[str, tuple[Chemical, Q_ | float]] | None = PrivateAttr(
+        default=None
+    )
+    _dependents: weakref.WeakValueDictionary[int, Solution] = PrivateAttr(
+        default_factory=weakref.WeakValueDictionary
+    )
 
     def __getitem__(self, key: str) -> Q_:
         return self.composition.of(key)
@@ -94,33 +108,102 @@ class Solution(BaseModel):
     def __hash__(self):
         return hash(self.name)
 
+    def model_post_init(self, __context: Any) -> None:
+        for component in self.components.values():
+            if isinstance(component, Solution):
+                component._add_dependent(self)
+
     @property
     def chemicals(self) -> Generator[tuple[str, Chemical], None, None]:
-        for k, v in self.components.items():
-            if isinstance(v, Chemical):
-                yield k, v
+        """Every chemical in this solution, including those of its
+        sub-solutions."""
+        seen_solutions = set()
+        seen_chemicals = set()
+        stack = [self]
+        while stack:
+            solution = stack.pop()
+            if id(solution) in seen_solutions:
+                continue
+            seen_solutions.add(id(solution))
+            for k, v in solution.components.items():
+                if isinstance(v, Solution):
+                    stack.append(v)
+                elif k not in seen_chemicals:
+                    seen_chemicals.add(k)
+                    yield k, v
+
+    @property
+    def solutions(self) -> Generator[Solution, None, None]:
+        """This solution and every solution it was prepared from."""
+        seen = set()
+        stack = [self]
+        while stack:
+            solution = stack.pop()
+            if id(solution) in seen:
+                continue
+            seen.add(id(solution))
+            yield solution
+            stack.extend(
+                v
+                for v in solution.components.values()
+                if isinstance(v, Solution)
+            )
+
+    @property
+    def mixing_graph(self) -> nx.DiGraph:
+        """
+        The full mixing graph of this solution, assembled from the graphs of
+        the solutions it was prepared from. ``G`` only holds the direct
+        components.
+        """
+        graph = nx.DiGraph()
+        for solution in self.solutions:
+            graph.add_nodes_from(solution.G.nodes)
+            graph.add_edges_from(solution.G.edges(data=True))
+        return graph
 
     def add_entity(self, entity: Chemical | Solution):
         self.components[entity.name] = entity
         self.G.add_node(entity.name)
+        self.invalidate()
         return self
 
+    def invalidate(self) -> None:
+        """
+        Drop the cached composition of this solution and of every solution
+        that was prepared from it.
+        """
+        seen = set()
+        stack = [self]
+        while stack:
+            solution = stack.pop()
+            if id(solution) in seen:
+                continue
+            seen.add(id(solution))
+            solution._composition = None
+            solution._leaf_amounts = None
+            stack.extend(solution._dependents.values())
+
+    def _add_dependent(self, solution: Solution) -> None:
+        # keyed by identity and held weakly, so registering is constant
+        # time and a stock does not keep the mixes made from it alive
+        self._dependents[id(solution)] = solution
+
     def with_component(
         self,
         component: Chemical | Solution,
         concentration: Q_,
     ):
         if isinstance(component, Solution):
-            if concentration.units != "percent":
+            if concentration.units != percent:
                 raise DimensionalityError(
                     "percent", component.name, concentration.units
                 )
         self.add_entity(component)
         self.G.add_edge(component.name, self.name, concentration=concentration)
         if isinstance(component, Solution):
-            self.G = nx.compose(self.G, component.G)
-            self.components.update(dict(component.chemicals))
-
+            component._add_dependent(self)
+        self.invalidate()
         return self
 
     def with_components(self, components: dict[Chemical | Solution, Q_]):
@@ -138,38 +221,68 @@ class Solution(BaseModel):
         self, node: str
     ) -> Generator[tuple[str, str, Q_ | float], None, None]:
         for source, _, conc in self.G.in_edges(node, data="concentration"):
-            match conc.units:
-                case "percent":
-                    yield source, node, conc.to("%").magnitude / 100
-                case _:
-                    yield source, node, conc
+            if conc.units == percent:
+                yield source, node, conc.magnitude / 100
+            else:
+                yield source, node, conc
 
     @property
     def composition(self) -> Composition:
-        makeup = {}
-
-        def traverse(node: str, factor: float = 1.0):
-            traversed = False
-            for source, _, conc in self.in_edges(node):
-                traversed = True
-                traverse(source, conc * factor)
-            if not traversed:
-                if node not in makeup:
-                    makeup[node] = factor
-                else:
-                    makeup[node] += factor
-
-        traverse(self.name)
-
-        composition = Composition()
-        chem_dict = dict(self.chemicals)
-        for k, v in makeup.items():
-            chem = chem_dict[k]
-            if isinstance(v, float):
-                composition.solvents[chem] = Percent(100 * v, "%")
+        if self._composition is None:
+            composition = Composition()
+            for chem, amount in self._leaves().values():
+                if isinstance(amount, float):
+                    composition.solvents[chem] = Q_(100 * amount, percent)
+                    continue
+                composition.solutes[chem] = amount
+            self._composition = composition
+        return self._composition
+
+    def _leaves(self) -> dict[str, tuple[Chemical, Q_ | float]]:
+        """
+        Amount of every chemical in this solution: a volume fraction for
+        solvents, a concentration for solutes. Sub-solutions are expanded
+        first, children before parents, and contribute their own cached
+        amounts scaled by their fraction, so each solution in a shared mixing
+        graph is only expanded once, however deeply it is nested.
+        """
+        stack = [self]
+        while stack:
+            solution = stack[-1]
+            if solution._leaf_amounts is not None:
+                stack.pop()
+                continue
+            pending = [
+                component
+                for component in solution.components.values()
+                if isinstance(component, Solution)
+                and component._leaf_amounts is None
+            ]
+            if pending:
+                stack.extend(pending)
                 continue
-            composition.solutes[chem] = v
-        return composition
+            solution._leaf_amounts = solution._own_leaves()
+            stack.pop()
+        return self._leaf_amounts
+
+    def _own_leaves(self) -> dict[str, tuple[Chemical, Q_ | float]]:
+        # the amounts of this solution, once those of its sub-solutions are
+        # cached
+        leaves = {}
+
+        def add(chem: Chemical, amount: Q_ | float):
+            if chem.name in leaves:
+                amount = leaves[chem.name][1] + amount
+            leaves[chem.name] = (chem, amount)
+
+        for source, _, factor in self.in_edges(self.name):
+            component = self.components[source]
+            if isinstance(component, Solution):
+                for chem, amount in component._leaf_amounts.values():
+                    add(chem, factor * amount)
+                continue
+            add(component, factor)
+        return leaves
 
     def dilute_with(
         self,
@@ -184,6 +297,23 @@ class Solution(BaseModel):
 
         return (
             Solution(name=name)
-            .with_component(self, Q_(ratio * 100, "%"))
-            .with_component(solvent, Q_((1 - ratio) * 100, "%"))
+            .with_component(self, Q_(ratio * 100, percent))
+            .with_component(solvent, Q_((1 - ratio) * 100, percent))
         )
+
+
+def _component_kind(value: Any) -> str:
+    if isinstance(value, dict):
+        return "solution" if "G" in value else "chemical"
+    return "solution" if isinstance(value, Solution) else "chemical"
+
+
+Component = Annotated[
+    Annotated[Chemical, Tag("chemical")]
+    | Annotated[Solution, Tag("solution")],
+    Discriminator(_component_kind),
+]
+"""A direct component of a solution. Chemical is a table model and is not
+validated, so the kind of a serialized component is decided up front."""
+
+Solution.model_rebuild()
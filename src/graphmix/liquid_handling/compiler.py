@@ -0,0 +1,171 @@
+from collections.abc import Iterable
+
+from graphmix.chemistry.units import FlowRate
+from graphmix.chemistry.units import Volume
+from graphmix.chemistry.units import uL
+from graphmix.chemistry.units import uL_per_s
+from graphmix.graph.protocol import Protocol
+from graphmix.graph.solution import Solution
+from graphmix.liquid_handling.liquid_handler import ChannelTransferRequest
+from graphmix.liquid_handling.liquid_handler import MixRequest
+from graphmix.liquid_handling.liquid_handler import MultiTransferRequest
+from graphmix.liquid_handling.liquid_handler import SingleTransferRequest
+from graphmix.liquid_handling.liquid_handler import TransferRequest
+from graphmix.liquid_handling.liquid_handler import same_solutes
+from graphmix.liquid_handling.program import Instruction
+from graphmix.liquid_handling.program import Opcode
+from graphmix.liquid_handling.program import Program
+from graphmix.liquid_handling.scheduler import TransferScheduler
+from graphmix.liquid_handling.scheduler import split_transfers
+from graphmix.location import Location
+from graphmix.location import LocationSet
+
+
+class _Compiler:
+    def __init__(self, tips: LocationSet, reuse_source_tips: bool = False):
+        self.tips = tips
+        self.reuse_source_tips = reuse_source_tips
+        self.grids: dict[str | None, int] = {}
+        self.instructions: list[Instruction] = []
+        self.has_tip = False
+        self.last_solution: Solution | None = None
+
+    def _emit(
+        self,
+        op: Opcode,
+        location: Location | None = None,
+        volume: Volume | None = None,
+        rate: FlowRate | None = None,
+        rounds: int = 0,
+        air_cushion: Volume | None = None,
+    ):
+        if location is None:
+            self.instructions.append(Instruction(op))
+            return
+        grid = self.grids.setdefault(location.grid, len(self.grids))
+        row, column = location.xy
+        self.instructions.append(
+            Instruction(
+                op,
+                grid,
+                row,
+                column,
+                0.0 if volume is None else volume.m_as(uL),
+                None if rate is None else rate.m_as(uL_per_s),
+                rounds,
+                0.0 if air_cushion is None else air_cushion.m_as(uL),
+            )
+        )
+
+    def drop_tip(self):
+        if self.has_tip:
+            self._emit(Opcode.DropTip)
+            self.has_tip = False
+            self.last_solution = None
+
+    def _tip_for(self, request: TransferRequest):
+        if (
+            request.reuse_tip
+            and self.has_tip
+            and self.last_solution is not None
+            and same_solutes(self.last_solution, request.source.solution)
+        ):
+            return
+        self.drop_tip()
+        self._emit(Opcode.PickUpTip, next(self.tips))
+        self.has_tip = True
+
+    def _mix(self, mix: MixRequest | None):
+        if mix is not None:
+            self._emit(
+                Opcode.Mix, mix.location, mix.volume, mix.rate, mix.rounds
+            )
+
+    def add(self, request: TransferRequest | ChannelTransferRequest):
+        match request:
+            case ChannelTransferRequest():
+                # a program drives a single channel, so the channels' transfers
+                # are carried out one after the other
+                for transfer in request.transfers:
+                    self.add(transfer)
+                return
+            case SingleTransferRequest():
+                volume = request.volume
+                destinations = [(request.destination, volume)]
+            case MultiTransferRequest():
+                volume = request.aspirate_volume
+                destinations = [
+                    (destination, request.dispense_volume)
+                    for destination in request.destinations
+                ]
+            case _:
+                raise TypeError(f"Cannot compile transfer request: {request}")
+        air_cushion = request.air_cushion if request.air_cushion else None
+        self._tip_for(request)
+        self._mix(request.aspirate_mix)
+        self._emit(
+            Opcode.Aspirate,
+            request.source.location,
+            volume,
+            request.aspirate_rate,
+            air_cushion=air_cushion,
+        )
+        self.last_solution = request.source.solution
+        for i, (destination, dispense_volume) in enumerate(destinations):
+            self._emit(
+                Opcode.Dispense,
+                destination.location,
+                dispense_volume,
+                request.dispense_rate,
+                air_cushion=(
+                    air_cushion if i == len(destinations) - 1 else None
+                ),
+            )
+            if not self.reuse_source_tips:
+                self.last_solution = destination.solution
+        if isinstance(request, SingleTransferRequest):
+            self._mix(request.dispense_mix)
+            if request.dispense_mix is not None:
+                self.last_solution = request.destination.solution
+
+    def program(self) -> Program:
+        return Program(grids=list(self.grids), instructions=self.instructions)
+
+
+def compile_requests(
+    requests: Iterable[TransferRequest | ChannelTransferRequest],
+    tips: LocationSet,
+    reuse_source_tips: bool = False,
+) -> Program:
+    """
+    Lower transfer requests to a program. Tips are taken from ``tips`` as
+    the program is compiled, and the last tip is dropped at the end. Tips
+    are reused as a handler with the same ``reuse_source_tips`` would.
+    """
+    compiler = _Compiler(tips, reuse_source_tips)
+    for request in requests:
+        compiler.add(request)
+    compiler.drop_tip()
+    return compiler.program()
+
+
+def compile_protocol(
+    protocol: Protocol,
+    tips: LocationSet,
+    max_transfer_volume: Volume,
+    min_transfer_volume: Volume | None = None,
+    reuse_tips: bool = True,
+    reuse_source_tips: bool = False,
+) -> Program:
+    """
+    Schedule the transfers of a solved protocol, split those above
+    ``max_transfer_volume`` and compile them to a program.
+    """
+    requests = split_transfers(
+        TransferScheduler(protocol, reuse_tips).schedule(),
+        max_transfer_volume,
+    )
+    program = compile_requests(requests, tips, reuse_source_tips)
+    if min_transfer_volume is not None:
+        program.check_volumes(min_transfer_volume, max_transfer_volume)
+    return program
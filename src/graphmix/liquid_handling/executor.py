@@ -0,0 +1,148 @@
+import asyncio
+from collections.abc import Iterable
+from collections.abc import Sequence
+
+from graphmix.graph.protocol import Protocol
+from graphmix.liquid_handling.liquid_handler import AbstractLiquidHandler
+from graphmix.liquid_handling.liquid_handler import ChannelTransferRequest
+from graphmix.liquid_handling.liquid_handler import SingleTransferRequest
+from graphmix.liquid_handling.liquid_handler import TransferRequest
+from graphmix.liquid_handling.scheduler import TransferScheduler
+from graphmix.location import Location
+from graphmix.location import Position
+
+
+def _sources(request: TransferRequest) -> set[str]:
+    if isinstance(request, ChannelTransferRequest):
+        return {t.source.name for t in request.transfers}
+    return {request.source.name}
+
+
+def _destinations(request: TransferRequest) -> set[str]:
+    if isinstance(request, ChannelTransferRequest):
+        return {t.destination.name for t in request.transfers}
+    if isinstance(request, SingleTransferRequest):
+        return {request.destination.name}
+    return {d.name for d in request.destinations}
+
+
+def _locations(request: TransferRequest) -> list[Location]:
+    if isinstance(request, ChannelTransferRequest):
+        return [
+            location
+            for transfer in request.transfers
+            for location in _locations(transfer)
+        ]
+    if isinstance(request, SingleTransferRequest):
+        return [request.source.location, request.destination.location]
+    return [request.source.location] + [
+        d.location for d in request.destinations
+    ]
+
+
+def dependencies(requests: Sequence[TransferRequest]) -> list[set[int]]:
+    """
+    Indices of the requests each request waits for: a node can only be
+    used as a source once every transfer into it has been dispensed.
+    """
+    into: dict[str, list[int]] = {}
+    for i, request in enumerate(requests):
+        for name in _destinations(request):
+            into.setdefault(name, []).append(i)
+    return [
+        {j for name in _sources(request) for j in into.get(name, ()) if j != i}
+        for i, request in enumerate(requests)
+    ]
+
+
+class ConcurrentExecutor:
+    """
+    Runs transfer requests on a pool of liquid handlers at once.
+
+    A request becomes ready when every request it depends on has finished.
+    Each handler takes the next ready request, preferring one from the
+    source it last aspirated so its tip can be reused, and holds a lock on
+    every well the request touches while it runs. Locks are taken in a
+    fixed order, so two handlers never wait on each other.
+    """
+
+    handlers: list[AbstractLiquidHandler]
+
+    def __init__(self, handlers: Iterable[AbstractLiquidHandler]):
+        self.handlers = list(handlers)
+        if not self.handlers:
+            raise ValueError("At least one liquid handler is required")
+        self._locks: dict[Position, asyncio.Lock] = {}
+
+    def _lock(self, position: Position) -> asyncio.Lock:
+        if position not in self._locks:
+            self._locks[position] = asyncio.Lock()
+        return self._locks[position]
+
+    async def _execute(
+        self, handler: AbstractLiquidHandler, request: TransferRequest
+    ):
+        positions = sorted(
+            {location.position for location in _locations(request)},
+            key=lambda p: (p.grid or "", p.row, p.column),
+        )
+        locks = [self._lock(p) for p in positions]
+        for lock in locks:
+            await lock.acquire()
+        try:
+            await handler.execute(request)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    async def run(self, requests: Iterable[TransferRequest]):
+        """Execute ``requests`` across the handlers, in dependency order."""
+        requests = list(requests)
+        waiting_on = dependencies(requests)
+        dependents: list[list[int]] = [[] for _ in requests]
+        for i, deps in enumerate(waiting_on):
+            for j in deps:
+                dependents[j].append(i)
+        ready = [i for i, deps in enumerate(waiting_on) if not deps]
+        remaining = len(requests)
+        changed = asyncio.Condition()
+
+        def has_work() -> bool:
+            return bool(ready) or not remaining
+
+        def take(handler: AbstractLiquidHandler) -> int:
+            last = handler.last_solution
+            for k, i in enumerate(ready):
+                if last is not None and last.name in _sources(requests[i]):
+                    return ready.pop(k)
+            return ready.pop(0)
+
+        async def worker(handler: AbstractLiquidHandler):
+            nonlocal remaining
+            while True:
+                async with changed:
+                    await changed.wait_for(has_work)
+                    if not remaining:
+                        break
+                    i = take(handler)
+                await self._execute(handler, requests[i])
+                async with changed:
+                    remaining -= 1
+                    for j in dependents[i]:
+                        waiting_on[j].discard(i)
+                        if not waiting_on[j]:
+                            ready.append(j)
+                    changed.notify_all()
+            await handler.drop_tip()
+
+        tasks = [asyncio.ensure_future(worker(h)) for h in self.handlers]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def run_protocol(self, protocol: Protocol, reuse_tips: bool = True):
+        """Schedule the transfers of a solved protocol and execute them."""
+        await self.run(TransferScheduler(protocol, reuse_tips).schedule())
@@ -1,13 +1,24 @@
+import contextlib
 import logging
+import math
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Iterable
+from typing import NamedTuple
 
 from pydantic import BaseModel
 
-from graphmix import Solution
+from graphmix.chemistry.units import Q_
 from graphmix.chemistry.units import FlowRate
 from graphmix.chemistry.units import Volume
+from graphmix.chemistry.units import dimensionless
+from graphmix.chemistry.units import uL
 from graphmix.graph.node import Node
+from graphmix.graph.solution import Solution
+from graphmix.liquid_handling.program import Opcode
+from graphmix.liquid_handling.program import Program
+from graphmix.liquid_handling.trace import EventBuffer
+from graphmix.liquid_handling.trace import Tracer
 from graphmix.location import Location
 from graphmix.location import LocationSet
 
@@ -24,16 +35,41 @@ class MixRequest(BaseModel):
 class TransferRequest(BaseModel):
     source: Node
     reuse_tip: bool = False
-    air_cushion: Volume = Volume(0, "uL")
-    aspirate_rate: FlowRate = None
-    dispense_rate: FlowRate = None
-    aspirate_mix: MixRequest = None
+    air_cushion: Volume = Q_(0, uL)
+    aspirate_rate: FlowRate | None = None
+    dispense_rate: FlowRate | None = None
+    aspirate_mix: MixRequest | None = None
 
 
 class SingleTransferRequest(TransferRequest):
     volume: Volume
     destination: Node
-    dispense_mix: MixRequest = None
+    dispense_mix: MixRequest | None = None
+
+    def split(self, max_volume: Volume) -> list["SingleTransferRequest"]:
+        """
+        Split into the fewest equal transfers of at most ``max_volume``. Every
+        part after the first reuses the tip; the source is mixed before the
+        first part and the destination after the last.
+        """
+        ratio = (self.volume / max_volume).m_as(dimensionless)
+        n_parts = math.ceil(round(ratio, 9))
+        if n_parts <= 1:
+            return [self]
+        volume = self.volume / n_parts
+        return [
+            self.model_copy(
+                update={
+                    "volume": volume,
+                    "reuse_tip": self.reuse_tip or i > 0,
+                    "aspirate_mix": self.aspirate_mix if i == 0 else None,
+                    "dispense_mix": (
+                        self.dispense_mix if i == n_parts - 1 else None
+                    ),
+                }
+            )
+            for i in range(n_parts)
+        ]
 
 
 class MultiTransferRequest(TransferRequest):
@@ -42,6 +78,91 @@ class MultiTransferRequest(TransferRequest):
     destinations: tuple[Node, ...]
 
 
+class ChannelTransferRequest(BaseModel):
+    """
+    Single transfers carried out together by the channels of a multi-channel
+    head of ``head`` (rows, columns) channels. ``channels[i]`` is the channel
+    used for ``transfers[i]``, numbered down each column of the head.
+    """
+
+    transfers: tuple[SingleTransferRequest, ...]
+    channels: tuple[int, ...]
+    head: tuple[int, int] = (8, 1)
+    aspirate_rate: FlowRate | None = None
+    dispense_rate: FlowRate | None = None
+
+    @property
+    def is_head96(self) -> bool:
+        """Whether the request is meant for a head of several columns."""
+        return self.head[1] > 1
+
+
+def can_share_channels(request: SingleTransferRequest) -> bool:
+    """
+    Whether a transfer can run on one channel of a multi-channel head, which
+    aspirates and dispenses without mixing or an air cushion.
+    """
+    return (
+        request.aspirate_mix is None
+        and request.dispense_mix is None
+        and not request.air_cushion.magnitude
+    )
+
+
+def same_solutes(a: Solution, b: Solution) -> bool:
+    """Whether a tip that touched ``a`` can be used for ``b``."""
+    return sorted(k.name for k in a.composition.solutes) == sorted(
+        k.name for k in b.composition.solutes
+    )
+
+
+class Head96Layout(NamedTuple):
+    """
+    Wells under a 96 head: the row and column of the well under its first
+    channel and the number of wells between neighbouring channels, e.g.
+    ``(0, 0, 1)`` for a whole 96 well plate and ``(1, 0, 2)`` for the second
+    quadrant of a 384 well plate.
+    """
+
+    row: int
+    column: int
+    step: int
+
+
+WHOLE_PLATE = Head96Layout(0, 0, 1)
+
+
+def head96_layout(
+    locations: list[Location], head: tuple[int, int] = (8, 12)
+) -> Head96Layout | None:
+    """
+    Layout of the wells under a 96 head whose channels, in order, sit over
+    ``locations``, or ``None`` if they are not the wells of one plate laid
+    out like the head.
+    """
+    rows, columns = head
+    if len(locations) != rows * columns or rows < 2:
+        return None
+    if len({location.grid for location in locations}) != 1:
+        return None
+    (row, column), (next_row, _) = locations[0].xy, locations[1].xy
+    step = next_row - row
+    if step < 1 or row >= step or column >= step:
+        return None
+    for channel, location in enumerate(locations):
+        head_column, head_row = divmod(channel, rows)
+        if location.xy != (row + step * head_row, column + step * head_column):
+            return None
+    return Head96Layout(row, column, step)
+
+
+class _LocationList(list):
+    """Locations that are only turned into strings when formatted."""
+
+    def __str__(self):
+        return str([str(location) for location in self])
+
+
 class AbstractLiquidHandler(ABC):
     tips: LocationSet
     max_transfer_volume: Volume
@@ -51,22 +172,48 @@ class AbstractLiquidHandler(ABC):
     aspiration_rate: FlowRate = None
     dispense_rate: FlowRate = None
     logger: logging.Logger = DEFAULT_LOGGER
+    n_channels: int = 1
+    head96: bool = False
+    tracer: Tracer | None = None
+    events: EventBuffer | None = None
+    # by default a dispense marks the tip with the destination solution; set
+    # for free dispensing, where the tip only ever touches its source, so
+    # transfers from one source can share a tip
+    reuse_source_tips: bool = False
+    _tips_on_head96: bool = False
+
+    def _log(self, message: str, *args):
+        """
+        Log an event, formatting it only if INFO is enabled, or keep it
+        unformatted in ``events`` when a buffer is set.
+        """
+        if self.events is not None:
+            self.events.append(message, args)
+        elif self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(message, *args, stacklevel=2)
+
+    def _span(self, name: str, **args):
+        if self.tracer is None:
+            return contextlib.nullcontext()
+        return self.tracer.span(name, has_tip=self.has_tip, **args)
 
     @abstractmethod
     async def _setup(self):
         raise NotImplementedError
 
     async def setup(self):
-        self.logger.info("Setting up liquid handler")
-        await self._setup()
+        self._log("Setting up liquid handler")
+        with self._span("setup"):
+            await self._setup()
 
     @abstractmethod
     async def _pick_up_tip(self, location: Location):
         raise NotImplementedError
 
     async def pick_up_tip(self, location: Location):
-        self.logger.info(f"Picking up tip at {location}")
-        await self._pick_up_tip(location)
+        self._log("Picking up tip at %s", location)
+        with self._span("pick_up_tip", location=location):
+            await self._pick_up_tip(location)
         self.has_tip = True
 
     @abstractmethod
@@ -76,10 +223,15 @@ class AbstractLiquidHandler(ABC):
     async def drop_tip(self):
         if not self.has_tip:
             return
-        self.logger.info("Dropping tip")
-        await self._drop_tip()
+        self._log("Dropping tip")
+        with self._span("drop_tip"):
+            if self._tips_on_head96:
+                await self._drop_tips96()
+            else:
+                await self._drop_tip()
         self.last_solution = None
         self.has_tip = False
+        self._tips_on_head96 = False
 
     @abstractmethod
     async def _aspirate(
@@ -98,10 +250,11 @@ class AbstractLiquidHandler(ABC):
         air_cushion: Volume | None = None,
         rate: FlowRate = None,
     ):
-        self.logger.info(f"Aspirating {volume} from {node.location}")
-        await self._aspirate(
-            volume, node.location, air_cushion=air_cushion, rate=rate
-        )
+        self._log("Aspirating %s from %s", volume, node.location)
+        with self._span("aspirate", volume=volume, location=node.location):
+            await self._aspirate(
+                volume, node.location, air_cushion=air_cushion, rate=rate
+            )
         self.last_solution = node.solution
 
     @abstractmethod
@@ -121,51 +274,57 @@ class AbstractLiquidHandler(ABC):
         air_cushion: Volume | None = None,
         rate: FlowRate | None = None,
     ):
-        self.logger.info(f"Dispensing {volume} to {node.location}")
-        await self._dispense(
-            volume, node.location, air_cushion=air_cushion, rate=rate
-        )
-        self.last_solution = node.solution
+        self._log("Dispensing %s to %s", volume, node.location)
+        with self._span("dispense", volume=volume, location=node.location):
+            await self._dispense(
+                volume, node.location, air_cushion=air_cushion, rate=rate
+            )
+        if not self.reuse_source_tips:
+            self.last_solution = node.solution
 
     def _can_reuse_tip(self, request: TransferRequest) -> bool:
-        if not request.reuse_tip:
+        if not request.reuse_tip or self.last_solution is None:
             return False
-        last_solutes = tuple(
-            sorted(
-                k.name for k in self.last_solution.composition.solutes.keys()
-            )
-        )
-        current_solutes = tuple(
-            sorted(
-                k.name
-                for k in request.source.solution.composition.solutes.keys()
-            )
-        )
-        return last_solutes == current_solutes
+        return same_solutes(self.last_solution, request.source.solution)
 
     async def mix(self, mix_request: MixRequest):
-        self.logger.info(
-            f"Mixing {mix_request.volume} at {mix_request.location}"
-        )
-        for _ in range(mix_request.rounds):
-            await self._aspirate(
-                mix_request.volume, mix_request.location, rate=mix_request.rate
-            )
-            await self._dispense(
-                mix_request.volume, mix_request.location, rate=mix_request.rate
-            )
+        self._log("Mixing %s at %s", mix_request.volume, mix_request.location)
+        with self._span(
+            "mix",
+            volume=mix_request.volume,
+            location=mix_request.location,
+            rounds=mix_request.rounds,
+        ):
+            for _ in range(mix_request.rounds):
+                await self._aspirate(
+                    mix_request.volume,
+                    mix_request.location,
+                    rate=mix_request.rate,
+                )
+                await self._dispense(
+                    mix_request.volume,
+                    mix_request.location,
+                    rate=mix_request.rate,
+                )
 
     async def change_tip(self):
-        self.logger.info("Changing tip")
+        self._log("Changing tip")
         await self.drop_tip()
-        await self.pick_up_tip(next(self.tips))
+        await self.pick_up_tip(self._next_tip())
+
+    def _next_tip(self) -> Location:
+        # a multi-channel handler takes single tips column by column, so
+        # whole columns are left for its channels
+        if self.n_channels > 1:
+            return self.tips.next_by_column()
+        return next(self.tips)
 
     @abstractmethod
     async def _finish_transfer(self, request: TransferRequest):
         raise NotImplementedError
 
     async def finish_transfer(self, request: TransferRequest):
-        self.logger.info("Finishing transfer")
+        self._log("Finishing transfer")
         await self._finish_transfer(request)
 
     @abstractmethod
@@ -175,7 +334,7 @@ class AbstractLiquidHandler(ABC):
     async def setup_transfer(
         self, request: TransferRequest
     ) -> tuple[FlowRate, FlowRate]:
-        self.logger.info(f"Setting up transfer from {request.source.location}")
+        self._log("Setting up transfer from %s", request.source.location)
         await self._setup_transfer()
 
         if not self._can_reuse_tip(request):
@@ -209,32 +368,57 @@ class AbstractLiquidHandler(ABC):
             )
 
     async def transfer(self, request: SingleTransferRequest):
+        if request.volume > self.max_transfer_volume:
+            self._log(
+                "Splitting transfer of %s into transfers of at most %s",
+                request.volume,
+                self.max_transfer_volume,
+            )
+            for part in request.split(self.max_transfer_volume):
+                await self.transfer(part)
+            return
         try:
             self._check_single_request(request)
         except ValueError as e:
             self.logger.error(e)
             raise
-        self.logger.info(
-            f"Transferring {request.volume} from {request.source.location} to "
-            f"{request.destination.location}"
-        )
-        aspiration_rate, dispense_rate = await self.setup_transfer(request)
-
-        if request.aspirate_mix:
-            await self.mix(request.aspirate_mix)
-
-        await self.aspirate(
-            request.volume, request.source, rate=aspiration_rate
+        self._log(
+            "Transferring %s from %s to %s",
+            request.volume,
+            request.source.location,
+            request.destination.location,
         )
+        with self._span(
+            "transfer",
+            volume=request.volume,
+            source=request.source.location,
+            destination=request.destination.location,
+        ):
+            aspiration_rate, dispense_rate = await self.setup_transfer(request)
+
+            if request.aspirate_mix:
+                await self.mix(request.aspirate_mix)
+
+            air_cushion = request.air_cushion if request.air_cushion else None
+            await self.aspirate(
+                request.volume,
+                request.source,
+                air_cushion=air_cushion,
+                rate=aspiration_rate,
+            )
 
-        await self.dispense(
-            request.volume, request.destination, rate=dispense_rate
-        )
+            await self.dispense(
+                request.volume,
+                request.destination,
+                air_cushion=air_cushion,
+                rate=dispense_rate,
+            )
 
-        if request.dispense_mix:
-            await self.mix(request.dispense_mix)
+            if request.dispense_mix:
+                await self.mix(request.dispense_mix)
+                self.last_solution = request.destination.solution
 
-        await self.finish_transfer(request)
+            await self.finish_transfer(request)
 
     def _check_multi_request(self, request: MultiTransferRequest):
         if request.aspirate_volume > self.max_transfer_volume:
@@ -263,30 +447,363 @@ class AbstractLiquidHandler(ABC):
 
     async def multi_transfer(self, request: MultiTransferRequest):
         try:
-            self._check_multi_request()
+            self._check_multi_request(request)
         except ValueError as e:
             self.logger.error(e)
             raise
-        self.logger.info(
-            f"Transferring {request.aspirate_volume} from "
-            f"{request.source.location} to {len(request.destinations)} "
-            f"destinations ({request.dispense_volume} each)"
+        self._log(
+            "Transferring %s from %s to %d destinations (%s each)",
+            request.aspirate_volume,
+            request.source.location,
+            len(request.destinations),
+            request.dispense_volume,
         )
-        aspiration_rate, dispense_rate = await self.setup_transfer(request)
+        with self._span(
+            "multi_transfer",
+            volume=request.aspirate_volume,
+            source=request.source.location,
+            destinations=[d.location for d in request.destinations],
+        ):
+            aspiration_rate, dispense_rate = await self.setup_transfer(request)
+
+            if request.aspirate_mix:
+                await self.mix(request.aspirate_mix)
+
+            air_cushion = request.air_cushion if request.air_cushion else None
+            await self.aspirate(
+                request.aspirate_volume,
+                request.source,
+                air_cushion=air_cushion,
+                rate=aspiration_rate,
+            )
+
+            # the cushion is blown out with the last dispense only
+            last = len(request.destinations) - 1
+            for i, destination in enumerate(request.destinations):
+                await self.dispense(
+                    request.dispense_volume,
+                    destination,
+                    air_cushion=air_cushion if i == last else None,
+                    rate=dispense_rate,
+                )
 
-        if request.aspirate_mix:
-            await self.mix(request.aspirate_mix)
+            await self.finish_transfer(request)
 
-        await self.aspirate(
-            request.aspirate_volume, request.source, rate=aspiration_rate
+    async def _pick_up_tips(
+        self, locations: list[Location], channels: tuple[int, ...]
+    ):
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support multi-channel transfers"
         )
 
-        for destination in request.destinations:
-            await self.dispense(
-                request.dispense_volume, destination, rate=dispense_rate
+    async def _aspirate_channels(
+        self,
+        volumes: list[Volume],
+        locations: list[Location],
+        channels: tuple[int, ...],
+        rate: FlowRate | None = None,
+    ):
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support multi-channel transfers"
+        )
+
+    async def _dispense_channels(
+        self,
+        volumes: list[Volume],
+        locations: list[Location],
+        channels: tuple[int, ...],
+        rate: FlowRate | None = None,
+    ):
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support multi-channel transfers"
+        )
+
+    async def _pick_up_tips96(self, rack: str | None):
+        raise NotImplementedError(
+            f"{type(self).__name__} does not have a 96 head"
+        )
+
+    async def _drop_tips96(self):
+        raise NotImplementedError(
+            f"{type(self).__name__} does not have a 96 head"
+        )
+
+    async def _aspirate96(
+        self,
+        volume: Volume,
+        grid: str | None,
+        layout: Head96Layout = WHOLE_PLATE,
+        rate: FlowRate | None = None,
+    ):
+        raise NotImplementedError(
+            f"{type(self).__name__} does not have a 96 head"
+        )
+
+    async def _dispense96(
+        self,
+        volume: Volume,
+        grid: str | None,
+        layout: Head96Layout = WHOLE_PLATE,
+        rate: FlowRate | None = None,
+    ):
+        raise NotImplementedError(
+            f"{type(self).__name__} does not have a 96 head"
+        )
+
+    def _head96_layouts(
+        self, request: ChannelTransferRequest
+    ) -> tuple[Head96Layout, Head96Layout] | None:
+        # the head dips every channel into a well of both plates at once, so
+        # it can only carry out equal transfers between whole 96 well
+        # layouts, with a fresh rack of tips
+        transfers = sorted(
+            zip(request.channels, request.transfers, strict=True),
+            key=lambda c: c[0],
+        )
+        if (
+            not self.head96
+            or request.head != (8, 12)
+            or [channel for channel, _ in transfers] != list(range(96))
+            or len({t.volume.m_as(uL) for t in request.transfers}) != 1
+            or len(self.tips) != 96
+        ):
+            return None
+        source = head96_layout([t.source.location for _, t in transfers])
+        destination = head96_layout(
+            [t.destination.location for _, t in transfers]
+        )
+        if source is None or destination is None:
+            return None
+        return source, destination
+
+    def _by_head_column(
+        self, request: ChannelTransferRequest
+    ) -> list[ChannelTransferRequest]:
+        rows = request.head[0]
+        columns: dict[int, list] = {}
+        for channel, transfer in zip(
+            request.channels, request.transfers, strict=True
+        ):
+            columns.setdefault(channel // rows, []).append(
+                (channel % rows, transfer)
+            )
+        return [
+            ChannelTransferRequest(
+                transfers=tuple(transfer for _, transfer in column),
+                channels=tuple(channel for channel, _ in column),
+                head=(rows, 1),
+                aspirate_rate=request.aspirate_rate,
+                dispense_rate=request.dispense_rate,
+            )
+            for _, column in sorted(columns.items())
+        ]
+
+    def _fits_channels(self, request: ChannelTransferRequest) -> bool:
+        if request.is_head96:
+            return self._head96_layouts(request) is not None
+        return max(request.channels) < self.n_channels
+
+    async def channel_transfer(self, request: ChannelTransferRequest):
+        """
+        Carry out the transfers of ``request`` with one aspirate and one
+        dispense across channels, or one by one when the handler does not
+        have the head the request needs, or a transfer has to be split,
+        mixed or needs an air cushion. A request for a 96 head that does not
+        cover whole 96 well layouts is carried out a head column at a time
+        on a multi-channel handler.
+        """
+        if (
+            request.is_head96
+            and self._head96_layouts(request) is None
+            and self.n_channels >= request.head[0]
+        ):
+            for column in self._by_head_column(request):
+                await self.channel_transfer(column)
+            return
+        if (
+            len(request.transfers) == 1
+            or not self._fits_channels(request)
+            or not all(can_share_channels(t) for t in request.transfers)
+            or any(
+                t.volume > self.max_transfer_volume for t in request.transfers
+            )
+        ):
+            for transfer in request.transfers:
+                await self.transfer(transfer)
+            return
+        try:
+            for transfer in request.transfers:
+                self._check_single_request(transfer)
+        except ValueError as e:
+            self.logger.error(e)
+            raise
+        self._log(
+            "Transferring with channels %s from %s",
+            request.channels,
+            _LocationList(t.source.location for t in request.transfers),
+        )
+        with self._span(
+            "channel_transfer",
+            channels=request.channels,
+            volumes=[t.volume for t in request.transfers],
+            sources=[t.source.location for t in request.transfers],
+            destinations=[t.destination.location for t in request.transfers],
+        ):
+            await self._setup_transfer()
+            await self.drop_tip()
+
+            aspiration_rate = (
+                request.aspirate_rate
+                if request.aspirate_rate is not None
+                else self.aspiration_rate
+            )
+            dispense_rate = (
+                request.dispense_rate
+                if request.dispense_rate is not None
+                else self.dispense_rate
+            )
+            if request.is_head96:
+                await self._head96_transfer(
+                    request, aspiration_rate, dispense_rate
+                )
+            else:
+                await self._channels_transfer(
+                    request, aspiration_rate, dispense_rate
+                )
+            self.last_solution = None
+            await self.finish_transfer(request)
+
+    async def _channels_transfer(
+        self,
+        request: ChannelTransferRequest,
+        aspiration_rate: FlowRate | None,
+        dispense_rate: FlowRate | None,
+    ):
+        tip_column = self.tips.take_column()
+        if max(request.channels) >= len(tip_column):
+            raise ValueError(
+                f"A tip column of {len(tip_column)} tips cannot serve "
+                f"channels {request.channels}"
             )
+        await self._pick_up_tips(
+            [tip_column[c] for c in request.channels], request.channels
+        )
+        self.has_tip = True
+        volumes = [t.volume for t in request.transfers]
+        await self._aspirate_channels(
+            volumes,
+            [t.source.location for t in request.transfers],
+            request.channels,
+            rate=aspiration_rate,
+        )
+        await self._dispense_channels(
+            volumes,
+            [t.destination.location for t in request.transfers],
+            request.channels,
+            rate=dispense_rate,
+        )
+
+    async def _head96_transfer(
+        self,
+        request: ChannelTransferRequest,
+        aspiration_rate: FlowRate | None,
+        dispense_rate: FlowRate | None,
+    ):
+        source_layout, destination_layout = self._head96_layouts(request)
+        self.tips.take_all()
+        await self._pick_up_tips96(self.tips.name)
+        self.has_tip = True
+        self._tips_on_head96 = True
+        first = request.transfers[0]
+        await self._aspirate96(
+            first.volume,
+            first.source.location.grid,
+            layout=source_layout,
+            rate=aspiration_rate,
+        )
+        await self._dispense96(
+            first.volume,
+            first.destination.location.grid,
+            layout=destination_layout,
+            rate=dispense_rate,
+        )
 
-        await self.finish_transfer(request)
+    async def execute(self, request: TransferRequest):
+        match request:
+            case SingleTransferRequest():
+                await self.transfer(request)
+            case MultiTransferRequest():
+                await self.multi_transfer(request)
+            case ChannelTransferRequest():
+                await self.channel_transfer(request)
+            case _:
+                raise TypeError(f"Unknown transfer request: {request}")
+
+    async def run_program(self, program: Program):
+        """
+        Run a compiled program. Its steps call the handler primitives
+        directly, without building or checking transfer requests.
+        """
+        self._log("Running program of %d instructions", len(program))
+        with self._span("run_program", instructions=len(program)):
+            for (
+                op,
+                location,
+                volume,
+                rate,
+                rounds,
+                air_cushion,
+            ) in program.steps():
+                match op:
+                    case Opcode.PickUpTip:
+                        await self._pick_up_tip(location)
+                        self.has_tip = True
+                    case Opcode.DropTip:
+                        await self._drop_tip()
+                        self.has_tip = False
+                    case Opcode.Aspirate:
+                        await self._aspirate(
+                            volume,
+                            location,
+                            air_cushion=air_cushion,
+                            rate=(
+                                self.aspiration_rate if rate is None else rate
+                            ),
+                        )
+                    case Opcode.Dispense:
+                        await self._dispense(
+                            volume,
+                            location,
+                            air_cushion=air_cushion,
+                            rate=self.dispense_rate if rate is None else rate,
+                        )
+                    case Opcode.Mix:
+                        for _ in range(rounds):
+                            await self._aspirate(
+                                volume,
+                                location,
+                                rate=(
+                                    self.aspiration_rate
+                                    if rate is None
+                                    else rate
+                                ),
+                            )
+                            await self._dispense(
+                                volume,
+                                location,
+                                rate=(
+                                    self.dispense_rate
+                                    if rate is None
+                                    else rate
+                                ),
+                            )
+        self.last_solution = None
+
+    async def run(self, requests: Iterable[TransferRequest]):
+        """Execute transfer requests in order and drop the tip at the end."""
+        for request in requests:
+            await self.execute(request)
+        await self.drop_tip()
 
 
 class MockLiquidHandler(AbstractLiquidHandler):
@@ -301,6 +818,9 @@ class MockLiquidHandler(AbstractLiquidHandler):
         aspiration_rate: FlowRate = None,
         dispense_rate: FlowRate = None,
         logger: logging.Logger = DEFAULT_LOGGER,
+        n_channels: int = 1,
+        head96: bool = False,
+        reuse_source_tips: bool = False,
     ):
         self.tips = tips
         self.max_transfer_volume = max_transfer_volume
@@ -308,6 +828,9 @@ class MockLiquidHandler(AbstractLiquidHandler):
         self.aspiration_rate = aspiration_rate
         self.dispense_rate = dispense_rate
         self.logger = logger
+        self.n_channels = n_channels
+        self.head96 = head96
+        self.reuse_source_tips = reuse_source_tips
         self.transfers = []
         self.called = []
 
@@ -339,6 +862,53 @@ class MockLiquidHandler(AbstractLiquidHandler):
     ):
         self.called.append("_dispense")
 
+    async def _pick_up_tips(
+        self, locations: list[Location], channels: tuple[int, ...]
+    ):
+        self.called.append("_pick_up_tips")
+
+    async def _aspirate_channels(
+        self,
+        volumes: list[Volume],
+        locations: list[Location],
+        channels: tuple[int, ...],
+        rate: FlowRate | None = None,
+    ):
+        self.called.append("_aspirate_channels")
+
+    async def _dispense_channels(
+        self,
+        volumes: list[Volume],
+        locations: list[Location],
+        channels: tuple[int, ...],
+        rate: FlowRate | None = None,
+    ):
+        self.called.append("_dispense_channels")
+
+    async def _pick_up_tips96(self, rack: str | None):
+        self.called.append("_pick_up_tips96")
+
+    async def _drop_tips96(self):
+        self.called.append("_drop_tips96")
+
+    async def _aspirate96(
+        self,
+        volume: Volume,
+        grid: str | None,
+        layout: Head96Layout = WHOLE_PLATE,
+        rate: FlowRate | None = None,
+    ):
+        self.called.append("_aspirate96")
+
+    async def _dispense96(
+        self,
+        volume: Volume,
+        grid: str | None,
+        layout: Head96Layout = WHOLE_PLATE,
+        rate: FlowRate | None = None,
+    ):
+        self.called.append("_dispense96")
+
     async def _finish_transfer(self, request: TransferRequest):
         self.called.append("_finish_transfer")
         self.transfers.append(request)
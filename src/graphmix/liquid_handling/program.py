@@ -0,0 +1,112 @@
+from typing import NamedTuple
+
+from pydantic import BaseModel
+from pydantic import PrivateAttr
+
+from graphmix.chemistry.units import Q_
+from graphmix.chemistry.units import FlowRate
+from graphmix.chemistry.units import Volume
+from graphmix.chemistry.units import uL
+from graphmix.chemistry.units import uL_per_s
+from graphmix.core.util import StrEnum
+from graphmix.location import Location
+from graphmix.location import Position
+
+
+class Opcode(StrEnum):
+    PickUpTip = "pick_up_tip"
+    DropTip = "drop_tip"
+    Aspirate = "aspirate"
+    Dispense = "dispense"
+    Mix = "mix"
+
+
+class Instruction(NamedTuple):
+    """
+    One step of a program. ``grid`` indexes ``Program.grids``; volumes are
+    in microliters and rates in microliters per second, ``None`` meaning the
+    handler's default. ``air_cushion`` is the air, in microliters, drawn
+    behind an aspirated volume and blown out after it is dispensed.
+    """
+
+    op: Opcode
+    grid: int = 0
+    row: int = 0
+    column: int = 0
+    volume: float = 0.0
+    rate: float | None = None
+    rounds: int = 0
+    air_cushion: float = 0.0
+
+
+class Step(NamedTuple):
+    op: Opcode
+    location: Location | None
+    volume: Volume | None
+    rate: FlowRate | None
+    rounds: int
+    air_cushion: Volume | None
+
+
+class Program(BaseModel):
+    """
+    A flat list of liquid handler instructions compiled from transfer
+    requests. Programs are validated when compiled or loaded and can be
+    stored as JSON and run on any handler with ``run_program``; see
+    ``graphmix.liquid_handling.compiler``.
+    """
+
+    grids: list[str | None] = []
+    instructions: list[Instruction] = []
+    _steps: list[Step] | None = PrivateAttr(default=None)
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def steps(self) -> list[Step]:
+        """The instructions with locations and quantities resolved once."""
+        if self._steps is None:
+            locations = {}
+            steps = []
+            for (
+                op,
+                grid,
+                row,
+                column,
+                volume,
+                rate,
+                rounds,
+                air_cushion,
+            ) in self.instructions:
+                location = None
+                if op != Opcode.DropTip:
+                    key = (grid, row, column)
+                    if key not in locations:
+                        locations[key] = Position(
+                            row, column, self.grids[grid]
+                        ).to_location()
+                    location = locations[key]
+                steps.append(
+                    Step(
+                        op,
+                        location,
+                        Q_(volume, uL) if volume else None,
+                        None if rate is None else Q_(rate, uL_per_s),
+                        rounds,
+                        Q_(air_cushion, uL) if air_cushion else None,
+                    )
+                )
+            self._steps = steps
+        return self._steps
+
+    def check_volumes(self, min_volume: Volume, max_volume: Volume):
+        """Raise if an aspirated or dispensed volume is out of range."""
+        low, high = min_volume.m_as(uL), max_volume.m_as(uL)
+        for i, instruction in enumerate(self.instructions):
+            if instruction.op not in (Opcode.Aspirate, Opcode.Dispense):
+                continue
+            if not low <= instruction.volume <= high:
+                raise ValueError(
+                    f"Instruction {i} {instruction.op} of "
+                    f"{instruction.volume} uL is outside of {low}-{high} uL"
+                )
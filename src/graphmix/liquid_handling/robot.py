@@ -9,13 +9,21 @@ from pylabrobot.resources import Cos_96_DW_500ul
 from pylabrobot.resources import Deck
 from pylabrobot.resources import Resource
 
+from graphmix.chemistry.units import Q_
 from graphmix.chemistry.units import FlowRate
 from graphmix.chemistry.units import Volume
+from graphmix.chemistry.units import uL
+from graphmix.chemistry.units import uL_per_s
 from graphmix.liquid_handling.liquid_handler import DEFAULT_LOGGER
+from graphmix.liquid_handling.liquid_handler import WHOLE_PLATE
 from graphmix.liquid_handling.liquid_handler import AbstractLiquidHandler
+from graphmix.liquid_handling.liquid_handler import Head96Layout
 from graphmix.liquid_handling.liquid_handler import TransferRequest
 from graphmix.location import Location
 from graphmix.location import LocationSet
+from graphmix.location import Position
+
+TIP_RACK = "tip_rack"
 
 
 def create_deck(
@@ -25,7 +33,7 @@ def create_deck(
         name="deck",
     )
     tip_car = TIP_CAR_480_A00(name="tip carrier")
-    tip_car[0] = HTF_L(name="tip_rack")
+    tip_car[0] = HTF_L(name=TIP_RACK)
     deck.assign_child_resource(tip_car, location=Coordinate(0, 0, 0))
     plt_car = PLT_CAR_L5AC_A00(name="plate carrier")
     tip_name = tips if isinstance(tips, str) else tips.name
@@ -37,7 +45,30 @@ def create_deck(
     return deck
 
 
+def microliters(volume: Volume | None) -> float | None:
+    """Magnitude of ``volume`` in microliters."""
+    if volume is None:
+        return None
+    if volume.units == uL:
+        return float(volume.magnitude)
+    return volume.m_as(uL)
+
+
+def flow_rate(rate: FlowRate | None) -> float | None:
+    """Magnitude of ``rate`` in microliters per second."""
+    if rate is None:
+        return None
+    return rate.m_as(uL_per_s)
+
+
 class Robot(AbstractLiquidHandler):
+    """
+    Liquid handler backed by a pylabrobot ``LiquidHandler``.
+
+    Wells are resolved on the deck once per (grid, row, column) and kept
+    until a resource is assigned to or unassigned from the deck.
+    """
+
     handler: LiquidHandler
 
     def __init__(
@@ -49,11 +80,14 @@ class Robot(AbstractLiquidHandler):
         logger: logging.Logger = DEFAULT_LOGGER,
         max_transfer_volume: Volume | None = None,
         min_transfer_volume: Volume | None = None,
+        n_channels: int = 1,
+        head96: bool = False,
+        reuse_source_tips: bool = False,
     ):
         if max_transfer_volume is None:
-            max_transfer_volume = Volume(200, "uL")
+            max_transfer_volume = Q_(200, uL)
         if min_transfer_volume is None:
-            min_transfer_volume = Volume(20, "uL")
+            min_transfer_volume = Q_(20, uL)
         self.tips = tips
         self.handler = handler
         self.aspiration_rate = aspiration_rate
@@ -61,17 +95,41 @@ class Robot(AbstractLiquidHandler):
         self.logger = logger
         self.max_transfer_volume = max_transfer_volume
         self.min_transfer_volume = min_transfer_volume
+        self.n_channels = n_channels
+        self.head96 = head96
+        self.reuse_source_tips = reuse_source_tips
+        self._resolved: dict[tuple[str | None, int, int], list[Resource]] = {}
+        handler.deck.register_did_assign_resource_callback(self._deck_changed)
+        handler.deck.register_did_unassign_resource_callback(
+            self._deck_changed
+        )
+
+    def _deck_changed(self, resource: Resource):
+        self.invalidate_resources()
+
+    def invalidate_resources(self):
+        """Forget every resolved well, e.g. after the deck was rearranged."""
+        self._resolved.clear()
+
+    def _resolve(self, grid: str | None, location: Location) -> list[Resource]:
+        row, column = location.xy
+        key = (grid, row, column)
+        resource = self._resolved.get(key)
+        if resource is None:
+            resource = self.handler.deck.get_resource(grid)[str(location)]
+            self._resolved[key] = resource
+        return resource
 
     async def _setup(self):
         await self.handler.setup()
+        self.invalidate_resources()
 
     @property
     def tip_location(self) -> Resource:
-        return self.handler.deck.get_resource("tip_rack")
+        return self.handler.deck.get_resource(TIP_RACK)
 
     async def _pick_up_tip(self, location: Location):
-        tip_location = self.tip_location[str(location)]
-        await self.handler.pick_up_tips(tip_location)
+        await self.handler.pick_up_tips(self._resolve(TIP_RACK, location))
 
     async def _drop_tip(self):
         await self.handler.discard_tips()
@@ -83,13 +141,10 @@ class Robot(AbstractLiquidHandler):
         air_cushion: Volume | None = None,
         rate: FlowRate | None = None,
     ):
-        grid = self.handler.deck.get_resource(location.grid)
-        loc = grid[str(location)]
-        vol = volume.to("uL").magnitude
-        if air_cushion is not None:
-            air_cushion = air_cushion.to("uL").magnitude
         await self.handler.aspirate(
-            loc, vols=vol, blow_out_air_volume=air_cushion
+            self._resolve(location.grid, location),
+            vols=microliters(volume),
+            blow_out_air_volume=microliters(air_cushion),
         )
 
     async def _dispense(
@@ -99,15 +154,124 @@ class Robot(AbstractLiquidHandler):
         air_cushion: Volume | None = None,
         rate: FlowRate = None,
     ):
-        grid = self.handler.deck.get_resource(location.grid)
-        loc = grid[str(location)]
-        vol = volume.to("uL").magnitude
-        if air_cushion is not None:
-            air_cushion = air_cushion.to("uL").magnitude
         await self.handler.dispense(
-            loc, vols=vol, blow_out_air_volume=air_cushion
+            self._resolve(location.grid, location),
+            vols=microliters(volume),
+            blow_out_air_volume=microliters(air_cushion),
         )
 
+    async def _pick_up_tips(
+        self, locations: list[Location], channels: tuple[int, ...]
+    ):
+        await self.handler.pick_up_tips(
+            [self._resolve(TIP_RACK, location)[0] for location in locations],
+            use_channels=list(channels),
+        )
+
+    def _resources(self, locations: list[Location]) -> list[Resource]:
+        return [
+            self._resolve(location.grid, location)[0] for location in locations
+        ]
+
+    async def _aspirate_channels(
+        self,
+        volumes: list[Volume],
+        locations: list[Location],
+        channels: tuple[int, ...],
+        rate: FlowRate | None = None,
+    ):
+        await self.handler.aspirate(
+            self._resources(locations),
+            vols=[microliters(volume) for volume in volumes],
+            use_channels=list(channels),
+        )
+
+    async def _dispense_channels(
+        self,
+        volumes: list[Volume],
+        locations: list[Location],
+        channels: tuple[int, ...],
+        rate: FlowRate | None = None,
+    ):
+        await self.handler.dispense(
+            self._resources(locations),
+            vols=[microliters(volume) for volume in volumes],
+            use_channels=list(channels),
+        )
+
+    async def _pick_up_tips96(self, rack: str | None):
+        await self.handler.pick_up_tips96(self.tip_location)
+
+    async def _drop_tips96(self):
+        # the rack the tips came from is spent, so they go back into it
+        await self.handler.drop_tips96(self.tip_location)
+
+    def _head96_wells(
+        self, grid: str | None, layout: Head96Layout
+    ) -> Resource | list[Resource]:
+        # a whole 96 well plate, or the wells of one quadrant of a denser
+        # plate in the order of the head's channels
+        plate = self.handler.deck.get_resource(grid)
+        if layout.step != plate.num_items_y // 8:
+            raise ValueError(
+                f"The channels of the 96 head do not line up with the wells "
+                f"of {grid}"
+            )
+        if layout == WHOLE_PLATE and plate.num_items_x == 12:
+            return plate
+        return [
+            self._resolve(
+                grid,
+                Position(
+                    layout.row + layout.step * (channel % 8),
+                    layout.column + layout.step * (channel // 8),
+                    grid,
+                ).to_location(),
+            )[0]
+            for channel in range(96)
+        ]
+
+    async def _pipette96(
+        self,
+        method: str,
+        volume: Volume,
+        grid: str | None,
+        layout: Head96Layout,
+        rate: FlowRate | None,
+    ):
+        wells = self._head96_wells(grid, layout)
+        # pylabrobot renamed aspirate_plate to aspirate96 in later releases,
+        # which also take the wells of a quadrant
+        pipette = getattr(self.handler, f"{method}96", None)
+        if pipette is None:
+            if isinstance(wells, list):
+                raise NotImplementedError(
+                    f"This pylabrobot version cannot {method} a quadrant of "
+                    f"{grid} with the 96 head"
+                )
+            pipette = getattr(self.handler, f"{method}_plate")
+        await pipette(
+            wells, volume=microliters(volume), flow_rate=flow_rate(rate)
+        )
+
+    async def _aspirate96(
+        self,
+        volume: Volume,
+        grid: str | None,
+        layout: Head96Layout = WHOLE_PLATE,
+        rate: FlowRate | None = None,
+    ):
+        await self._pipette96("aspirate", volume, grid, layout, rate)
+
+    async def _dispense96(
+        self,
+        volume: Volume,
+        grid: str | None,
+        layout: Head96Layout = WHOLE_PLATE,
+        rate: FlowRate | None = None,
+    ):
+        await self._pipette96("dispense", volume, grid, layout, rate)
+
     async def _finish_transfer(self, request: TransferRequest):
         pass
 
@@ -0,0 +1,420 @@
+import itertools
+import math
+from collections.abc import Iterable
+
+import networkx as nx
+
+from graphmix.chemistry.units import Q_
+from graphmix.chemistry.units import Volume
+from graphmix.chemistry.units import uL
+from graphmix.graph.node import Node
+from graphmix.graph.protocol import Protocol
+from graphmix.liquid_handling.liquid_handler import ChannelTransferRequest
+from graphmix.liquid_handling.liquid_handler import MultiTransferRequest
+from graphmix.liquid_handling.liquid_handler import SingleTransferRequest
+from graphmix.liquid_handling.liquid_handler import TransferRequest
+from graphmix.liquid_handling.liquid_handler import can_share_channels
+from graphmix.location import Location
+from graphmix.location import LocationSet
+
+
+def serpentine_key(location: Location) -> tuple[str, int, int]:
+    """
+    Sort key that visits a grid row by row, reversing direction on every
+    other row so the head never travels back across the plate.
+    """
+    row, column = location.xy
+    return location.grid or "", row, column if row % 2 == 0 else -column
+
+
+def visited_locations(
+    requests: Iterable[TransferRequest],
+) -> Iterable[Location]:
+    for request in requests:
+        if isinstance(request, ChannelTransferRequest):
+            yield from visited_locations(request.transfers)
+            continue
+        yield request.source.location
+        if isinstance(request, SingleTransferRequest):
+            yield request.destination.location
+        else:
+            yield from (d.location for d in request.destinations)
+
+
+def head_travel(requests: Iterable[TransferRequest]) -> float:
+    """
+    Distance, in wells, travelled by the head between consecutive aspirate
+    and dispense locations on the same grid.
+    """
+    travel = 0.0
+    previous = None
+    for location in visited_locations(requests):
+        if previous is not None and previous.grid == location.grid:
+            travel += math.dist(previous.xy, location.xy)
+        previous = location
+    return travel
+
+
+def tip_changes(requests: Iterable[TransferRequest]) -> int:
+    """Number of requests that do not allow the previous tip to be reused."""
+    return sum(1 for request in requests if not request.reuse_tip)
+
+
+class TransferScheduler:
+    """
+    Derives the transfers of a solved protocol from its edge volumes and
+    orders them to use few tips and little head travel.
+
+    Transfers are grouped by source so one tip serves every destination of a
+    source. A node is only used as a source once every transfer into it has
+    been scheduled, so sources are taken one topological generation at a
+    time. Within a generation, sources and their destinations are visited in
+    serpentine plate order.
+    """
+
+    protocol: Protocol
+    reuse_tips: bool
+
+    def __init__(self, protocol: Protocol, reuse_tips: bool = True):
+        self.protocol = protocol
+        self.reuse_tips = reuse_tips
+
+    def _destinations(self, source: Node) -> list[tuple[Node, Volume]]:
+        destinations = []
+        for _, target, volume in self.protocol.G.out_edges(
+            source.name, data="volume"
+        ):
+            if volume is None:
+                raise ValueError(
+                    f"Transfer from {source.name} to {target} has no volume; "
+                    "solve the protocol first."
+                )
+            if volume.magnitude > 0:
+                destinations.append((self.protocol.nodes[target], volume))
+        destinations.sort(key=lambda d: serpentine_key(d[0].location))
+        return destinations
+
+    def generations(self) -> list[list[SingleTransferRequest]]:
+        """
+        The scheduled transfers split by stage. Transfers within a stage are
+        independent of each other; every transfer into a source belongs to
+        an earlier stage.
+        """
+        stages = []
+        for generation in nx.topological_generations(self.protocol.G):
+            sources = sorted(
+                (self.protocol.nodes[n] for n in generation),
+                key=lambda n: serpentine_key(n.location),
+            )
+            stage = []
+            for source in sources:
+                for i, (destination, volume) in enumerate(
+                    self._destinations(source)
+                ):
+                    stage.append(
+                        SingleTransferRequest(
+                            source=source,
+                            destination=destination,
+                            volume=volume,
+                            reuse_tip=self.reuse_tips and i > 0,
+                        )
+                    )
+            if stage:
+                stages.append(stage)
+        return stages
+
+    def schedule(self) -> list[SingleTransferRequest]:
+        return [request for stage in self.generations() for request in stage]
+
+
+def split_transfers(
+    requests: Iterable[TransferRequest], max_transfer_volume: Volume
+) -> list[TransferRequest]:
+    """
+    Replace every single transfer above ``max_transfer_volume`` with the
+    fewest equal transfers that fit the pipette, reusing the tip between
+    them.
+    """
+    split: list[TransferRequest] = []
+    for request in requests:
+        if isinstance(request, SingleTransferRequest):
+            split.extend(request.split(max_transfer_volume))
+        else:
+            split.append(request)
+    return split
+
+
+def _volume_groups(
+    requests: list[SingleTransferRequest],
+) -> list[list[SingleTransferRequest]]:
+    groups: list[list[SingleTransferRequest]] = []
+    for request in requests:
+        volume = request.volume.m_as(uL)
+        for group in groups:
+            if math.isclose(group[0].volume.m_as(uL), volume):
+                group.append(request)
+                break
+        else:
+            groups.append([request])
+    return groups
+
+
+def consolidate(
+    requests: Iterable[TransferRequest],
+    max_transfer_volume: Volume,
+    dead_volume: Volume | None = None,
+    excess_volume: Volume | None = None,
+) -> list[TransferRequest]:
+    """
+    Merge consecutive single transfers from the same source into
+    multi-dispense requests.
+
+    Transfers of a run from one source are grouped by volume and packed so
+    that the aspirated volume (every dispense, plus ``dead_volume`` left in
+    the tip and an optional conditioning ``excess_volume``) stays within
+    ``max_transfer_volume``. Runs are kept in their original order, so a
+    dependency-safe schedule stays dependency safe. The extra volume drawn
+    per aspiration is reported by ``source_overhead``; use
+    ``consolidate_protocol`` to reserve it in the protocol's volumes.
+    """
+    extra = Q_(0, uL)
+    if dead_volume is not None:
+        extra = extra + dead_volume
+    if excess_volume is not None:
+        extra = extra + excess_volume
+    capacity = (max_transfer_volume - extra).m_as(uL)
+
+    consolidated: list[TransferRequest] = []
+    for _, run in itertools.groupby(
+        requests,
+        key=lambda r: (
+            r.source.name if isinstance(r, SingleTransferRequest) else id(r)
+        ),
+    ):
+        run = list(run)
+        if not isinstance(run[0], SingleTransferRequest):
+            consolidated.extend(run)
+            continue
+        reuse_tip = run[0].reuse_tip
+        for group in _volume_groups(run):
+            volume = group[0].volume
+            per_aspiration = max(1, int(capacity // volume.m_as(uL)))
+            for start in range(0, len(group), per_aspiration):
+                chunk = group[start : start + per_aspiration]
+                if len(chunk) == 1:
+                    request = chunk[0].model_copy(
+                        update={"reuse_tip": reuse_tip}
+                    )
+                else:
+                    request = MultiTransferRequest(
+                        source=chunk[0].source,
+                        reuse_tip=reuse_tip,
+                        aspirate_volume=volume * len(chunk) + extra,
+                        dispense_volume=volume,
+                        destinations=tuple(r.destination for r in chunk),
+                        aspirate_rate=chunk[0].aspirate_rate,
+                        dispense_rate=chunk[0].dispense_rate,
+                        air_cushion=chunk[0].air_cushion,
+                    )
+                consolidated.append(request)
+                reuse_tip = True
+    return consolidated
+
+
+def source_overhead(requests: Iterable[TransferRequest]) -> dict[str, Volume]:
+    """
+    Volume aspirated from each source beyond what is dispensed, which has to
+    be added to the initial volume of the source.
+    """
+    overhead: dict[str, Volume] = {}
+    for request in requests:
+        if not isinstance(request, MultiTransferRequest):
+            continue
+        dispensed = request.dispense_volume * len(request.destinations)
+        extra = request.aspirate_volume - dispensed
+        name = request.source.name
+        overhead[name] = overhead.get(name, Q_(0, uL)) + extra
+    return overhead
+
+
+def consolidate_protocol(
+    protocol: Protocol,
+    max_transfer_volume: Volume,
+    dead_volume: Volume | None = None,
+    excess_volume: Volume | None = None,
+    reuse_tips: bool = True,
+    max_rounds: int = 10,
+) -> list[TransferRequest]:
+    """
+    Schedule and consolidate the transfers of ``protocol``, reserving the
+    source overhead of the multi-dispenses in its volumes. Reserving more
+    liquid in a node raises the transfers into it, which may change how
+    they are consolidated, so the protocol is re-solved until the overhead
+    settles; this takes at most one round per level of the mixing graph.
+    """
+    for _ in range(max_rounds):
+        requests = consolidate(
+            TransferScheduler(protocol.solve(), reuse_tips).schedule(),
+            max_transfer_volume,
+            dead_volume,
+            excess_volume,
+        )
+        overhead = source_overhead(requests)
+        reserved = {
+            name: volume
+            for name, volume in protocol.overheads.items()
+            if volume.magnitude > 0
+        }
+        if overhead.keys() == reserved.keys() and all(
+            math.isclose(volume.m_as(uL), reserved[name].m_as(uL))
+            for name, volume in overhead.items()
+        ):
+            return requests
+        protocol.with_overhead(
+            {name: Q_(0, uL) for name in reserved} | overhead
+        )
+    raise ValueError(
+        f"Source overhead did not settle after {max_rounds} rounds"
+    )
+
+
+def _channel_step(
+    grid: str | None,
+    grids: dict[str, LocationSet],
+    channel_pitch: float,
+) -> int | None:
+    # wells between neighbouring channels, or None if the channels do not
+    # land on the wells of the grid
+    if grid not in grids:
+        return 1
+    step = channel_pitch / grids[grid].well_pitch
+    if step < 1 or not math.isclose(step, round(step)):
+        return None
+    return round(step)
+
+
+def _channel_groups(
+    stage: list[SingleTransferRequest],
+    head: tuple[int, int],
+    grids: dict[str, LocationSet],
+    channel_pitch: float,
+) -> list[list[tuple[int, SingleTransferRequest]]]:
+    head_rows, head_columns = head
+    buckets: dict[tuple, list[tuple[tuple[int, int], SingleTransferRequest]]]
+    buckets = {}
+    for request in stage:
+        if not can_share_channels(request):
+            continue
+        source, destination = (
+            request.source.location,
+            request.destination.location,
+        )
+        source_step = _channel_step(source.grid, grids, channel_pitch)
+        destination_step = _channel_step(
+            destination.grid, grids, channel_pitch
+        )
+        if source_step is None or destination_step is None:
+            continue
+        # positions in units of the channel pitch, and the well the first
+        # channel sits in within a pitch
+        source_frame, source_phase = zip(
+            *(divmod(i, source_step) for i in source.xy), strict=True
+        )
+        destination_frame, destination_phase = zip(
+            *(divmod(i, destination_step) for i in destination.xy),
+            strict=True,
+        )
+        key = (
+            source.grid,
+            destination.grid,
+            source_phase,
+            destination_phase,
+            destination_frame[0] - source_frame[0],
+            destination_frame[1] - source_frame[1],
+        )
+        buckets.setdefault(key, []).append((source_frame, request))
+
+    groups = []
+    for bucket in buckets.values():
+        remaining = sorted(bucket, key=lambda r: tuple(reversed(r[0])))
+        while remaining:
+            anchor_row, anchor_column = remaining[0][0]
+            group, rest, used = [], [], set()
+            for (row, column), request in remaining:
+                channel = (row - anchor_row) + head_rows * (
+                    column - anchor_column
+                )
+                if (
+                    anchor_row <= row < anchor_row + head_rows
+                    and anchor_column <= column < anchor_column + head_columns
+                    and channel not in used
+                ):
+                    used.add(channel)
+                    group.append((channel, request))
+                else:
+                    rest.append(((row, column), request))
+            groups.append(group)
+            remaining = rest
+    return groups
+
+
+def _with_tip_reuse(requests: list[TransferRequest]) -> list[TransferRequest]:
+    planned = []
+    previous_source = None
+    for request in requests:
+        if isinstance(request, ChannelTransferRequest):
+            previous_source = None
+        else:
+            reuse_tip = (
+                request.reuse_tip and previous_source == request.source.name
+            )
+            if reuse_tip != request.reuse_tip:
+                request = request.model_copy(update={"reuse_tip": reuse_tip})
+            previous_source = request.source.name
+        planned.append(request)
+    return planned
+
+
+def plan_channels(
+    stages: Iterable[list[SingleTransferRequest]],
+    head: tuple[int, int] = (8, 1),
+    grids: dict[str, LocationSet] | None = None,
+    channel_pitch: float = 9.0,
+) -> list[TransferRequest]:
+    """
+    Map transfers of each stage onto a multi-channel head of ``head``
+    (rows, columns) channels ``channel_pitch`` mm apart: ``(8, 1)`` for an
+    8-channel pipette, ``(8, 12)`` for a 96 head. Transfers are carried out
+    together when their sources fit under the head at once and every
+    destination sits at the same offset from its source, so the head moves
+    rigidly between plates. Wells are spaced by the pitch of their plate in
+    ``grids`` (plates not listed are taken to match the head), and plates
+    whose pitch does not divide the channel pitch are not grouped.
+    Transfers that do not line up with any other, or that mix or need an
+    air cushion, stay single-channel.
+    """
+    grids = grids or {}
+    planned: list[TransferRequest] = []
+    for stage in stages:
+        order = {id(request): i for i, request in enumerate(stage)}
+        first_of_group: dict[int, ChannelTransferRequest] = {}
+        grouped = set()
+        for group in _channel_groups(stage, head, grids, channel_pitch):
+            if len(group) < 2:
+                continue
+            group.sort(key=lambda g: g[0])
+            first = min(group, key=lambda g: order[id(g[1])])[1]
+            first_of_group[id(first)] = ChannelTransferRequest(
+                transfers=tuple(request for _, request in group),
+                channels=tuple(channel for channel, _ in group),
+                head=head,
+                aspirate_rate=first.aspirate_rate,
+                dispense_rate=first.dispense_rate,
+            )
+            grouped.update(id(request) for _, request in group)
+        for request in stage:
+            if id(request) in first_of_group:
+                planned.append(first_of_group[id(request)])
+            elif id(request) not in grouped:
+                planned.append(request)
+    return _with_tip_reuse(planned)
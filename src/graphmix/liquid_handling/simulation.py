@@ -0,0 +1,291 @@
+import logging
+import math
+
+from pydantic import BaseModel
+
+from graphmix.chemistry.units import Q_
+from graphmix.chemistry.units import FlowRate
+from graphmix.chemistry.units import Length
+from graphmix.chemistry.units import Speed
+from graphmix.chemistry.units import Time
+from graphmix.chemistry.units import Volume
+from graphmix.chemistry.units import uL
+from graphmix.chemistry.units import uL_per_s
+from graphmix.graph.protocol import Protocol
+from graphmix.liquid_handling.liquid_handler import DEFAULT_LOGGER
+from graphmix.liquid_handling.liquid_handler import WHOLE_PLATE
+from graphmix.liquid_handling.liquid_handler import AbstractLiquidHandler
+from graphmix.liquid_handling.liquid_handler import Head96Layout
+from graphmix.liquid_handling.liquid_handler import MixRequest
+from graphmix.liquid_handling.liquid_handler import TransferRequest
+from graphmix.liquid_handling.scheduler import TransferScheduler
+from graphmix.location import Location
+from graphmix.location import LocationSet
+from graphmix.location import Position
+
+
+class TimeModel(BaseModel):
+    """
+    Durations of the elementary operations of a liquid handler. Pipetting
+    takes a fixed settling time plus the volume over the flow rate, and the
+    head moves between wells of one grid at ``head_speed`` over a
+    ``well_pitch`` spacing; moving to another grid takes ``grid_change``.
+    """
+
+    tip_pick_up: Time = Q_(4, "s")
+    tip_drop: Time = Q_(3, "s")
+    aspirate_rate: FlowRate = Q_(6, "mL/min")
+    dispense_rate: FlowRate = Q_(6, "mL/min")
+    settle: Time = Q_(0.5, "s")
+    well_pitch: Length = Q_(9, "mm")
+    head_speed: Speed = Q_(200, "mm/s")
+    grid_change: Time = Q_(2, "s")
+
+    def pipetting(
+        self, volume: Volume, rate: FlowRate | None, default: FlowRate
+    ) -> float:
+        """Seconds to aspirate or dispense ``volume``."""
+        rate = default if rate is None else rate
+        return self.seconds("settle") + (volume.m_as(uL) / rate.m_as(uL_per_s))
+
+    def travel(self, start: Location | None, end: Location) -> float:
+        """Seconds to move the head from ``start`` to ``end``."""
+        if start is None or start.grid != end.grid:
+            return self.seconds("grid_change")
+        return math.dist(start.xy, end.xy) * self.seconds("well")
+
+    def seconds(self, name: str) -> float:
+        """
+        Seconds taken by the operation ``name``, or by moving one ``well``;
+        read from the current fields, so a changed model is never stale.
+        """
+        if name == "well":
+            return (self.well_pitch / self.head_speed).m_as("s")
+        return getattr(self, name).m_as("s")
+
+
+class SimulationReport(BaseModel):
+    runtime: Time
+    phases: dict[str, Time]
+    tips_used: int
+    transfers: int
+
+
+class SimulatedLiquidHandler(AbstractLiquidHandler):
+    """
+    Liquid handler that advances a clock according to a ``TimeModel``
+    instead of moving hardware, so the runtime of a set of transfer requests
+    can be predicted and compared.
+    """
+
+    time_model: TimeModel
+    clock: float
+    phases: dict[str, float]
+    tips_used: int
+    transfers: int
+
+    def __init__(
+        self,
+        tips: LocationSet,
+        max_transfer_volume: Volume,
+        min_transfer_volume: Volume,
+        time_model: TimeModel | None = None,
+        aspiration_rate: FlowRate = None,
+        dispense_rate: FlowRate = None,
+        logger: logging.Logger = DEFAULT_LOGGER,
+        n_channels: int = 1,
+        head96: bool = False,
+        reuse_source_tips: bool = False,
+    ):
+        self.tips = tips
+        self.max_transfer_volume = max_transfer_volume
+        self.min_transfer_volume = min_transfer_volume
+        self.time_model = TimeModel() if time_model is None else time_model
+        self.aspiration_rate = aspiration_rate
+        self.dispense_rate = dispense_rate
+        self.logger = logger
+        self.n_channels = n_channels
+        self.head96 = head96
+        self.reuse_source_tips = reuse_source_tips
+        self.reset()
+
+    def reset(self):
+        self.clock = 0.0
+        self.phases = {}
+        self.tips_used = 0
+        self.transfers = 0
+        self._head: Location | None = None
+        self._phase: str | None = None
+
+    def _spend(self, phase: str, seconds: float):
+        self.clock += seconds
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def _move(self, location: Location):
+        self._spend("move", self.time_model.travel(self._head, location))
+        self._head = location
+
+    async def _setup(self):
+        self.reset()
+
+    async def _pick_up_tip(self, location: Location):
+        self._move(location)
+        self._spend("tip", self.time_model.seconds("tip_pick_up"))
+        self.tips_used += 1
+
+    async def _drop_tip(self):
+        self._spend("tip", self.time_model.seconds("tip_drop"))
+
+    async def _aspirate(
+        self,
+        volume: Volume,
+        location: Location,
+        air_cushion: Volume | None = None,
+        rate: FlowRate | None = None,
+    ):
+        self._move(location)
+        self._spend(
+            self._phase or "aspirate",
+            self.time_model.pipetting(
+                volume, rate, self.time_model.aspirate_rate
+            ),
+        )
+
+    async def _dispense(
+        self,
+        volume: Volume,
+        location: Location,
+        air_cushion: Volume | None = None,
+        rate: FlowRate | None = None,
+    ):
+        self._move(location)
+        self._spend(
+            self._phase or "dispense",
+            self.time_model.pipetting(
+                volume, rate, self.time_model.dispense_rate
+            ),
+        )
+
+    async def mix(self, mix_request: MixRequest):
+        self._phase = "mix"
+        try:
+            await super().mix(mix_request)
+        finally:
+            self._phase = None
+
+    async def _pick_up_tips(
+        self, locations: list[Location], channels: tuple[int, ...]
+    ):
+        self._move(locations[0])
+        self._spend("tip", self.time_model.seconds("tip_pick_up"))
+        self.tips_used += len(locations)
+
+    async def _aspirate_channels(
+        self,
+        volumes: list[Volume],
+        locations: list[Location],
+        channels: tuple[int, ...],
+        rate: FlowRate | None = None,
+    ):
+        self._move(locations[0])
+        self._spend(
+            "aspirate",
+            self.time_model.pipetting(
+                max(volumes), rate, self.time_model.aspirate_rate
+            ),
+        )
+
+    async def _dispense_channels(
+        self,
+        volumes: list[Volume],
+        locations: list[Location],
+        channels: tuple[int, ...],
+        rate: FlowRate | None = None,
+    ):
+        self._move(locations[0])
+        self._spend(
+            "dispense",
+            self.time_model.pipetting(
+                max(volumes), rate, self.time_model.dispense_rate
+            ),
+        )
+
+    async def _pick_up_tips96(self, rack: str | None):
+        self._move(Location(row="A", column=1, grid=rack))
+        self._spend("tip", self.time_model.seconds("tip_pick_up"))
+        self.tips_used += 96
+
+    async def _drop_tips96(self):
+        self._spend("tip", self.time_model.seconds("tip_drop"))
+
+    async def _aspirate96(
+        self,
+        volume: Volume,
+        grid: str | None,
+        layout: Head96Layout = WHOLE_PLATE,
+        rate: FlowRate | None = None,
+    ):
+        self._move(Position(layout.row, layout.column, grid).to_location())
+        self._spend(
+            "aspirate",
+            self.time_model.pipetting(
+                volume, rate, self.time_model.aspirate_rate
+            ),
+        )
+
+    async def _dispense96(
+        self,
+        volume: Volume,
+        grid: str | None,
+        layout: Head96Layout = WHOLE_PLATE,
+        rate: FlowRate | None = None,
+    ):
+        self._move(Position(layout.row, layout.column, grid).to_location())
+        self._spend(
+            "dispense",
+            self.time_model.pipetting(
+                volume, rate, self.time_model.dispense_rate
+            ),
+        )
+
+    async def _setup_transfer(self):
+        pass
+
+    async def _finish_transfer(self, request: TransferRequest):
+        self.transfers += 1
+
+    def report(self) -> SimulationReport:
+        return SimulationReport(
+            runtime=Q_(self.clock, "s"),
+            phases={
+                phase: Q_(seconds, "s")
+                for phase, seconds in self.phases.items()
+            },
+            tips_used=self.tips_used,
+            transfers=self.transfers,
+        )
+
+
+async def simulate(
+    protocol: Protocol,
+    tips: LocationSet,
+    max_transfer_volume: Volume,
+    min_transfer_volume: Volume,
+    time_model: TimeModel | None = None,
+    reuse_tips: bool = True,
+    reuse_source_tips: bool = False,
+) -> SimulationReport:
+    """
+    Predict the runtime of a solved protocol: schedule its transfers and
+    carry them out on a ``SimulatedLiquidHandler``. ``reuse_source_tips``
+    is passed on to the handler.
+    """
+    handler = SimulatedLiquidHandler(
+        tips=tips,
+        max_transfer_volume=max_transfer_volume,
+        min_transfer_volume=min_transfer_volume,
+        time_model=time_model,
+        reuse_source_tips=reuse_source_tips,
+    )
+    await handler.run(TransferScheduler(protocol, reuse_tips).schedule())
+    return handler.report()
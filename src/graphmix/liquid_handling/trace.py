@@ -0,0 +1,151 @@
+import csv
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+from typing import NamedTuple
+
+from graphmix.chemistry.units import ureg
+from graphmix.location import Location
+
+
+class Span(NamedTuple):
+    """One traced operation. Timestamps are monotonic, in nanoseconds."""
+
+    name: str
+    start: int
+    end: int
+    args: dict[str, Any]
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+
+def _export_value(value: Any) -> Any:
+    match value:
+        case ureg.Quantity():
+            return value.m_as("uL") if value.check("[volume]") else str(value)
+        case Location():
+            return f"{value.grid}:{value}" if value.grid else str(value)
+        case tuple() | list():
+            return [_export_value(v) for v in value]
+    return value
+
+
+def _export_args(args: dict[str, Any]) -> dict[str, Any]:
+    """Arguments ready for export. Volumes are given in microliters."""
+    return {key: _export_value(value) for key, value in args.items()}
+
+
+class _ActiveSpan:
+    __slots__ = ("args", "name", "start", "tracer")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.spans.append(
+            Span(self.name, self.start, time.perf_counter_ns(), self.args)
+        )
+        return False
+
+
+class Tracer:
+    """
+    Collects spans around liquid handler operations. Arguments are stored
+    as given and only formatted on export, so tracing costs little more
+    than two clock reads per operation.
+    """
+
+    name: str
+    spans: list[Span]
+
+    def __init__(self, name: str = "liquid handler"):
+        self.name = name
+        self.spans = []
+
+    def span(self, name: str, **args: Any) -> _ActiveSpan:
+        return _ActiveSpan(self, name, args)
+
+    def clear(self):
+        self.spans.clear()
+
+    def totals(self) -> dict[str, int]:
+        """Total nanoseconds spent in each kind of operation."""
+        totals: dict[str, int] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0) + span.duration
+        return totals
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """
+        The spans as Chrome trace-event JSON, viewable in ``chrome://tracing``
+        or Perfetto.
+        """
+        origin = min((s.start for s in self.spans), default=0)
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": (span.start - origin) / 1000,
+                    "dur": span.duration / 1000,
+                    "pid": 1,
+                    "tid": self.name,
+                    "args": _export_args(span.args),
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path: str | Path):
+        with Path(path).open("w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def write_csv(self, path: str | Path):
+        keys = sorted({key for span in self.spans for key in span.args})
+        with Path(path).open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "start_ns", "end_ns", *keys])
+            for span in self.spans:
+                args = _export_args(span.args)
+                writer.writerow(
+                    [
+                        span.name,
+                        span.start,
+                        span.end,
+                        *(args.get(key, "") for key in keys),
+                    ]
+                )
+
+
+class EventBuffer:
+    """
+    Ring buffer of the most recent log events of a liquid handler. Events
+    are kept as the message and its arguments, with a monotonic timestamp,
+    and only formatted when read.
+    """
+
+    def __init__(self, maxlen: int = 10_000):
+        self.events: deque[tuple[int, str, tuple]] = deque(maxlen=maxlen)
+
+    def __len__(self):
+        return len(self.events)
+
+    def append(self, message: str, args: tuple):
+        self.events.append((time.perf_counter_ns(), message, args))
+
+    def clear(self):
+        self.events.clear()
+
+    def messages(self) -> list[str]:
+        return [message % args for _, message, args in self.events]
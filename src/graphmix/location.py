@@ -1,12 +1,120 @@
+import functools
+import string
 from collections.abc import Callable
 from collections.abc import Generator
 from collections.abc import Iterable
 from typing import Any
+from typing import ClassVar
 
+import numpy as np
 from pydantic import BaseModel
 
 from graphmix.chemistry.units import Volume
 
+# height in mm spanned by the rows of a plate of the standard footprint,
+# e.g. 8 rows 9 mm apart on a 96 well plate
+SBS_ROWS_SPAN = 72.0
+
+
+def row_label(index: int) -> str:
+    """Zero-based row index to its letter label: A..Z, then AA, AB, ..."""
+    label = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(remainder + 65) + label
+    return label
+
+
+@functools.cache
+def row_index(label: str) -> int:
+    """Letter label of a row to its zero-based index."""
+    index = 0
+    for char in label:
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def _split_label(label: str) -> tuple[str, int]:
+    digits = label.lstrip(string.ascii_uppercase)
+    return label[: len(label) - len(digits)], int(digits)
+
+
+class Position:
+    """
+    Immutable, interned coordinate of a location: the grid name and the
+    zero-based row and column. Equal positions are the same object, and
+    hashing and ordering only use integers.
+    """
+
+    __slots__ = ("_hash", "column", "grid", "row")
+    _interned: ClassVar[dict[tuple[str | None, int, int], "Position"]] = {}
+
+    grid: str | None
+    row: int
+    column: int
+
+    def __new__(cls, row: int, column: int, grid: str | None = None):
+        key = (grid, row, column)
+        position = cls._interned.get(key)
+        if position is None:
+            position = super().__new__(cls)
+            object.__setattr__(position, "grid", grid)
+            object.__setattr__(position, "row", row)
+            object.__setattr__(position, "column", column)
+            object.__setattr__(position, "_hash", hash(key))
+            cls._interned[key] = position
+        return position
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Position is immutable")
+
+    def __reduce__(self):
+        return Position, (self.row, self.column, self.grid)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, Position):
+            return self is other
+        return NotImplemented
+
+    def __lt__(self, other: "Position"):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.row, self.column) < (other.row, other.column)
+
+    def __le__(self, other: "Position"):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.row, self.column) <= (other.row, other.column)
+
+    def __gt__(self, other: "Position"):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.row, self.column) > (other.row, other.column)
+
+    def __ge__(self, other: "Position"):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.row, self.column) >= (other.row, other.column)
+
+    def __str__(self):
+        return f"{row_label(self.row)}{self.column + 1}"
+
+    def __repr__(self):
+        return f"Position({self.row}, {self.column}, grid={self.grid!r})"
+
+    @property
+    def xy(self) -> tuple[int, int]:
+        return self.row, self.column
+
+    def to_location(self) -> "Location":
+        return Location.model_construct(
+            grid=self.grid, row=row_label(self.row), column=self.column + 1
+        )
+
 
 class Location(BaseModel):
     """
@@ -25,12 +133,10 @@ class Location(BaseModel):
     def from_str(cls, location: str) -> "Location":
         if ":" in location:
             parent_name, location = location.split(":")
-            return cls(
-                row=location[0],
-                column=int(location[1:]),
-                grid=parent_name,
-            )
-        return cls(row=location[0], column=int(location[1:]))
+            row, column = _split_label(location)
+            return cls(row=row, column=column, grid=parent_name)
+        row, column = _split_label(location)
+        return cls(row=row, column=column)
 
     def with_grid(self, grid: str) -> "Location":
         return self.model_copy(update={"grid": grid})
@@ -42,7 +148,11 @@ class Location(BaseModel):
 
     @property
     def xy(self) -> tuple[int, int]:
-        return ord(self.row) - 65, self.column - 1
+        return row_index(self.row), self.column - 1
+
+    @property
+    def position(self) -> Position:
+        return Position(row_index(self.row), self.column - 1, self.grid)
 
     def with_next_location(
         self, next_location: Callable[[], "Location"]
@@ -53,60 +163,216 @@ class Location(BaseModel):
         return f"{self.row}{self.column}"
 
     def __hash__(self):
-        return hash(str(self))
+        return hash(self.xy)
+
+    def _key(self, other) -> tuple[int, int] | None:
+        match other:
+            case Location():
+                return other.xy
+            case str():
+                try:
+                    return Location.from_str(other).xy
+                except ValueError:
+                    return None
+        return None
 
     def __eq__(self, other):
-        return str(self) == str(other)
+        key = self._key(other)
+        if key is None:
+            return NotImplemented
+        return self.xy == key
 
     def __lt__(self, other):
-        return str(self) < str(other)
+        key = self._key(other)
+        if key is None:
+            return NotImplemented
+        return self.xy < key
 
     def __le__(self, other):
-        return str(self) <= str(other)
+        key = self._key(other)
+        if key is None:
+            return NotImplemented
+        return self.xy <= key
 
     def __gt__(self, other):
-        return str(self) > str(other)
+        key = self._key(other)
+        if key is None:
+            return NotImplemented
+        return self.xy > key
 
     def __ge__(self, other):
-        return str(self) >= str(other)
+        key = self._key(other)
+        if key is None:
+            return NotImplemented
+        return self.xy >= key
+
+
+class Occupancy:
+    """
+    Occupancy bitmap of a grid, indexed row-major, with a cursor to the first
+    cell that may be free. Cells are only freed by a reset, so the cursor
+    never moves backwards and finding the next free cell is amortized O(1).
+
+    The most recently handed out cell stays pending until the next
+    allocation, so a location can still be checked against its set while it
+    is being used.
+    """
+
+    __slots__ = ("cells", "cursor", "n_occupied", "pending")
+
+    def __init__(self, size: int):
+        self.cells = np.zeros(size, dtype=bool)
+        self.cursor = 0
+        self.n_occupied = 0
+        self.pending: int | None = None
+
+    def occupy(self, index: int):
+        if not self.cells[index]:
+            self.cells[index] = True
+            self.n_occupied += 1
+
+    def commit(self):
+        if self.pending is not None:
+            self.occupy(self.pending)
+            self.pending = None
+
+    def next_free(self) -> int | None:
+        self.commit()
+        cells = self.cells
+        size = len(cells)
+        while self.cursor < size and cells[self.cursor]:
+            self.cursor += 1
+        if self.cursor == size:
+            return None
+        self.pending = self.cursor
+        return self.cursor
+
+    def take(self, n: int) -> np.ndarray:
+        self.commit()
+        free = np.flatnonzero(~self.cells[self.cursor :])[:n] + self.cursor
+        if len(free) < n:
+            raise ValueError(
+                f"Only {len(free)} of {n} requested locations are free."
+            )
+        self.cells[free] = True
+        self.n_occupied += n
+        return free
 
 
 class LocationSet(BaseModel):
+    """
+    A grid of locations handed out in row-major order. Which locations are
+    taken is kept in an occupancy bitmap shared by copies of the set;
+    ``skip_locations`` only records locations reserved explicitly.
+    """
+
     name: str | None = None
     n_rows: int
     n_columns: int
     max_volume: Volume | None = None
     dead_volume: Volume | None = None
+    pitch: float | None = None
     skip_locations: set[Location] = set()
-    _iterator: Generator[Location, None, None] | None = None
+    _occupancy: Occupancy = None
 
     def model_post_init(self, __context: Any) -> None:
-        self._iterator = self.location_generator()
+        self._occupancy = Occupancy(self.n_rows * self.n_columns)
+        for location in self.skip_locations:
+            self._occupy(location)
 
     def __len__(self):
-        return self.n_rows * self.n_columns - len(self.skip_locations)
+        return self.n_rows * self.n_columns - self._occupancy.n_occupied
+
+    @property
+    def well_pitch(self) -> float:
+        """
+        Distance between neighbouring wells in mm: ``pitch`` when given,
+        otherwise that of a plate of the standard (SBS) footprint.
+        """
+        if self.pitch is not None:
+            return self.pitch
+        return SBS_ROWS_SPAN / self.n_rows
+
+    def _index(self, location: Location | str) -> int | None:
+        if isinstance(location, str):
+            location = Location.from_str(location)
+        row, column = location.xy
+        if not (0 <= row < self.n_rows and 0 <= column < self.n_columns):
+            return None
+        return row * self.n_columns + column
+
+    def _occupy(self, location: Location | str):
+        index = self._index(location)
+        if index is not None:
+            self._occupancy.occupy(index)
+
+    def _location(self, index: int) -> Location:
+        row, column = divmod(index, self.n_columns)
+        location = Position(row, column, self.name).to_location()
+        location._next_location = self.__next__
+        return location
 
     def location_generator(self) -> Generator[Location, None, None]:
-        for row in range(self.n_rows):
-            for column in range(self.n_columns):
-                location = Location(
-                    row=chr(row + 65),
-                    column=column + 1,
-                    grid=self.name,
-                ).with_next_location(lambda: next(self))
-                if location in self.skip_locations:
-                    continue
-                yield location
-                self.skip_locations.add(location)
+        while True:
+            index = self._occupancy.next_free()
+            if index is None:
+                return
+            yield self._location(index)
 
     def __iter__(self) -> Iterable[Location]:
         return self
 
     def __next__(self) -> Location:
-        return next(self._iterator)
+        index = self._occupancy.next_free()
+        if index is None:
+            raise StopIteration
+        return self._location(index)
+
+    def take(self, n: int) -> list[Location]:
+        """Take the next ``n`` free locations."""
+        return [self._location(i) for i in self._occupancy.take(n).tolist()]
+
+    def next_by_column(self) -> Location:
+        """
+        Take the first free location in column-major order, so that whole
+        columns stay free for as long as possible.
+        """
+        self._occupancy.commit()
+        cells = self._occupancy.cells.reshape(self.n_rows, self.n_columns)
+        free = np.flatnonzero(~cells.T.ravel())
+        if not len(free):
+            raise ValueError("No free location left.")
+        column, row = divmod(int(free[0]), self.n_rows)
+        index = row * self.n_columns + column
+        self._occupancy.occupy(index)
+        return self._location(index)
+
+    def take_column(self) -> list[Location]:
+        """Take every location of the first column that is entirely free."""
+        self._occupancy.commit()
+        cells = self._occupancy.cells.reshape(self.n_rows, self.n_columns)
+        free_columns = np.flatnonzero(~cells.any(axis=0))
+        if not len(free_columns):
+            raise ValueError("No free column left.")
+        column = int(free_columns[0])
+        indices = np.arange(self.n_rows) * self.n_columns + column
+        for index in indices.tolist():
+            self._occupancy.occupy(index)
+        return [self._location(i) for i in indices.tolist()]
+
+    def take_all(self) -> list[Location]:
+        """Take every location of a set that is entirely free."""
+        self._occupancy.commit()
+        if self._occupancy.n_occupied:
+            raise ValueError("The location set is not entirely free.")
+        indices = list(range(self.n_rows * self.n_columns))
+        for index in indices:
+            self._occupancy.occupy(index)
+        return [self._location(i) for i in indices]
 
     def __contains__(self, item):
-        return item not in self.skip_locations
+        index = self._index(item)
+        return index is not None and not self._occupancy.cells[index]
 
     def __getitem__(self, item: int | str | tuple) -> Location:
         match item:
@@ -116,7 +382,7 @@ class LocationSet(BaseModel):
                 if row >= self.n_rows or column >= self.n_columns:
                     raise IndexError("Index out of range.")
                 return Location(
-                    row=chr(row + 65), column=column + 1, grid=self.name
+                    row=row_label(row), column=column + 1, grid=self.name
                 )
             case str():
                 loc = Location.from_str(item)
@@ -128,11 +394,11 @@ class LocationSet(BaseModel):
                 row, column = item
                 if row >= self.n_rows or column >= self.n_columns:
                     raise IndexError("Index out of range.")
-                return Location(row=chr(row + 65), column=column + 1)
+                return Location(row=row_label(row), column=column + 1)
 
     def reset(self):
         self.skip_locations.clear()
-        self._iterator = None
+        self._occupancy = Occupancy(self.n_rows * self.n_columns)
 
     def with_occupied_location(
         self, location: Location | str
@@ -140,6 +406,7 @@ class LocationSet(BaseModel):
         if isinstance(location, str):
             location = Location.from_str(location)
         self.skip_locations.add(location)
+        self._occupy(location)
         return self
 
     def with_occupied_locations(
@@ -158,6 +425,9 @@ class LocationSet(BaseModel):
     def with_name(self, name: str) -> "LocationSet":
         return self.model_copy(update={"name": name})
 
+    def with_pitch(self, pitch: float) -> "LocationSet":
+        return self.model_copy(update={"pitch": pitch})
+
 
 class WellPlate(LocationSet):
     def __class_getitem__(cls, item) -> LocationSet:
@@ -174,3 +444,5 @@ class WellPlate(LocationSet):
                 return LocationSet(n_rows=8, n_columns=12)
             case 384:
                 return LocationSet(n_rows=16, n_columns=24)
+            case 1536:
+                return LocationSet(n_rows=32, n_columns=48)
@@ -7,6 +7,7 @@ from graphmix.chemistry.chemical import Chemical
 from graphmix.chemistry.service_layer.registry import ChemicalRegistry
 from graphmix.chemistry.service_layer.unit_of_work import ChemicalUnitOfWork
 from graphmix.chemistry.units import Q_
+from graphmix.graph.builder import standards
 from graphmix.graph.protocol import Protocol
 from graphmix.graph.solution import Solution
 from graphmix.location import WellPlate
@@ -82,3 +83,22 @@ def dilution_protocol(saline, water, diluted_solution_name) -> Protocol:
             into="0",
         )
     )
+
+
+@pytest.fixture
+def standard_curve(saline, water) -> Protocol:
+    """BCA standard curve of saline diluted with water, not yet solved."""
+    return (
+        standards.StandardCurveBuilder(
+            name="BCA",
+            final_volume=Q_(100, "uL"),
+            grids={"0": WellPlate[96].with_dead_volume(Q_(10, "uL"))},
+            stock_grid="0",
+            diluent_grid="0",
+            out_grid="0",
+            steps=standards.BCA_STANDARD_CURVE,
+        )
+        .with_stock(saline)
+        .with_diluent(water)
+        .build()
+    )
@@ -1,14 +1,33 @@
+import pytest
+
+from graphmix import config
 from graphmix.chemistry.service_layer.registry import ChemicalRegistry
 from graphmix.chemistry.service_layer.unit_of_work import ChemicalUnitOfWork
 from graphmix.chemistry.units import Q_
 
 
+@pytest.mark.skipif(config.OFFLINE, reason="PubChem is not reachable offline")
 def test_chemical_registry_adds_chemical_when_not_known(
     sqlite_session_factory,
 ):
     uow = ChemicalUnitOfWork(sqlite_session_factory)
 
-    reg = ChemicalRegistry(uow)
+    # caffeine is not in the bundled snapshot, so it is looked up on PubChem
+    reg = ChemicalRegistry(uow, offline=False)
+    assert "caffeine" not in reg.snapshot
+
+    caffeine = reg.Chemical("caffeine")
+    assert caffeine.name == "caffeine"
+    assert caffeine.formula == "C8H10N4O2"
+    assert caffeine.molar_mass == Q_("194.19 g/mol")
+
+
+def test_chemical_registry_adds_chemical_from_snapshot(
+    sqlite_session_factory,
+):
+    uow = ChemicalUnitOfWork(sqlite_session_factory)
+
+    reg = ChemicalRegistry(uow, offline=True)
 
     water = reg.Chemical("water")
     assert water.name == "water"
@@ -0,0 +1,108 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+
+from graphmix.chemistry.service_layer.pubchem import PROP_STRING
+from graphmix.chemistry.service_layer.pubchem import NotFoundError
+from graphmix.chemistry.service_layer.pubchem import PubChemService
+from graphmix.chemistry.units import Q_
+
+COMPOUNDS = {
+    "water": ("H2O", "O", 18.015),
+    "sodium chloride": ("ClNa", "[Na+].[Cl-]", 58.44),
+    "ethanol": ("C2H6O", "CCO", 46.07),
+}
+
+
+class StubPubChemHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        prefix = "/rest/pug/compound/name/"
+        suffix = f"/property/{PROP_STRING}/JSON"
+        path = self.path
+        if not (path.startswith(prefix) and path.endswith(suffix)):
+            self.send_error(400)
+            return
+        name = unquote(path[len(prefix) : -len(suffix)])
+        self.server.requested.append(name)
+        if name == "broken":
+            self.send_error(500)
+            return
+        if name not in COMPOUNDS:
+            self.send_error(404)
+            return
+        formula, smiles, weight = COMPOUNDS[name]
+        body = json.dumps(
+            {
+                "PropertyTable": {
+                    "Properties": [
+                        {
+                            "CID": 1,
+                            "MolecularFormula": formula,
+                            "CanonicalSMILES": smiles,
+                            "MolecularWeight": str(weight),
+                        }
+                    ]
+                }
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPubChemHandler)
+    server.requested = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def pubchem(stub_server):
+    host, port = stub_server.server_address
+    return PubChemService(
+        requests_per_second=100, base_uri=f"http://{host}:{port}/rest/pug"
+    )
+
+
+def test_lookup(pubchem):
+    chemical = pubchem.lookup("sodium chloride")
+
+    assert chemical.formula == "ClNa"
+    assert chemical.molar_mass == Q_(58.44, "g/mol")
+
+
+def test_lookup_unknown_name(pubchem):
+    with pytest.raises(NotFoundError):
+        pubchem.lookup("unobtainium")
+
+
+def test_lookup_many_reports_failures_per_name(pubchem, stub_server):
+    names = ["water", "unobtainium", "broken", "ethanol", "water"]
+
+    batch = pubchem.lookup_all(names)
+
+    assert sorted(batch.chemicals) == ["ethanol", "water"]
+    assert batch.chemicals["ethanol"].smiles == "CCO"
+    assert isinstance(batch.errors["unobtainium"], NotFoundError)
+    assert not isinstance(batch.errors["broken"], NotFoundError)
+    assert sorted(stub_server.requested) == [
+        "broken",
+        "ethanol",
+        "unobtainium",
+        "water",
+    ]
@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import pytest
+from requests import ConnectionError
+
+from graphmix.chemistry.chemical import Chemical
+from graphmix.chemistry.service_layer.pubchem import NotFoundError
+from graphmix.chemistry.service_layer.pubchem import PubChemService
+from graphmix.chemistry.service_layer.registry import ChemicalRegistry
+from graphmix.chemistry.service_layer.snapshot import ChemicalSnapshot
+from graphmix.chemistry.service_layer.unit_of_work import ChemicalUnitOfWork
+from graphmix.core.cache import TTLCache
+
+
+class StubPubChem(PubChemService):
+    def __init__(self, known: dict[str, str]):
+        super().__init__()
+        self.known = known
+        self.lookups: list[str] = []
+
+    def lookup(self, name: str) -> Chemical:
+        self.lookups.append(name)
+        if name == "flaky":
+            raise ConnectionError(name)
+        if name not in self.known:
+            raise NotFoundError(name)
+        return Chemical(
+            name=name, formula=self.known[name], molar_mass="10 g/mol"
+        )
+
+
+@pytest.fixture
+def snapshot(tmp_path) -> ChemicalSnapshot:
+    path = tmp_path / "snapshot.json"
+    path.write_text(
+        json.dumps(
+            [
+                {
+                    "name": "Glycerol",
+                    "formula": "C3H8O3",
+                    "smiles": "C(C(CO)O)O",
+                    "molar_mass": "92.09 g/mol",
+                }
+            ]
+        )
+    )
+    return ChemicalSnapshot(path)
+
+
+@pytest.fixture
+def stub_registry(sqlite_session_factory, snapshot):
+    return ChemicalRegistry(
+        ChemicalUnitOfWork(sqlite_session_factory),
+        pubchem=StubPubChem({"water": "H2O", "ethanol": "C2H6O"}),
+        snapshot=snapshot,
+        offline=False,
+    )
+
+
+def test_get_chemicals_queries_pubchem_only_for_unknown_names(
+    stub_registry, nacl
+):
+    stub_registry.add_chemical(nacl)
+
+    chemicals = stub_registry.get_chemicals(
+        [" Water", "NACL", "ethanol", "glycerol"]
+    )
+
+    assert list(chemicals) == [" Water", "NACL", "ethanol", "glycerol"]
+    assert chemicals[" Water"].formula == "H2O"
+    assert chemicals["NACL"].formula == "NaCl"
+    assert chemicals["ethanol"].formula == "C2H6O"
+    assert chemicals["glycerol"].formula == "C3H8O3"
+    assert sorted(stub_registry.pubchem.lookups) == ["ethanol", "water"]
+
+
+def test_looked_up_chemicals_are_stored(stub_registry):
+    stub_registry.get_chemicals(["water", "ethanol", "glycerol"])
+    stub_registry.cache.clear()
+
+    chemicals = stub_registry.get_chemicals(["water", "ethanol", "glycerol"])
+
+    assert chemicals["water"].id is not None
+    assert chemicals["glycerol"].id is not None
+    assert sorted(stub_registry.pubchem.lookups) == ["ethanol", "water"]
+
+
+def test_lookups_inside_a_running_event_loop(stub_registry):
+    async def main():
+        return stub_registry.get_chemicals(["water", "ethanol"])
+
+    chemicals = asyncio.run(main())
+
+    assert chemicals["ethanol"].formula == "C2H6O"
+    assert sorted(stub_registry.pubchem.lookups) == ["ethanol", "water"]
+
+
+def test_get_chemical_is_cached(stub_registry):
+    water = stub_registry.get_chemical("water")
+    stub_registry.uow = None
+
+    assert stub_registry.get_chemical("WATER") is water
+
+
+def test_cache_hits_keep_their_expiry(stub_registry):
+    now = [0.0]
+    stub_registry.cache = TTLCache(ttl=10, clock=lambda: now[0])
+    stub_registry.get_chemical("water")
+
+    now[0] = 5
+    stub_registry.get_chemicals(["water", "ethanol"])
+    now[0] = 10.5
+    assert stub_registry.cache.get("water") is None
+    assert stub_registry.cache.get("ethanol") is not None
+
+
+def test_get_chemicals_reports_every_unknown_name(stub_registry):
+    with pytest.raises(ValueError, match="unobtainium, nothing"):
+        stub_registry.get_chemicals(["water", "unobtainium", "nothing"])
+
+
+def test_unknown_names_are_not_looked_up_again(stub_registry):
+    for _ in range(2):
+        with pytest.raises(ValueError, match="not found"):
+            stub_registry.get_chemical("unobtainium")
+    assert stub_registry.pubchem.lookups == ["unobtainium"]
+
+    stub_registry.unknown_ttl = 0
+    with pytest.raises(ValueError, match="not found"):
+        stub_registry.get_chemical("unobtainium")
+    assert stub_registry.pubchem.lookups == ["unobtainium", "unobtainium"]
+
+
+def test_failed_lookups_are_retried(stub_registry):
+    for _ in range(2):
+        with pytest.raises(ValueError, match="not found"):
+            stub_registry.get_chemical("flaky")
+    assert stub_registry.pubchem.lookups == ["flaky", "flaky"]
+
+
+def test_offline_registry_never_queries_pubchem(stub_registry):
+    stub_registry.offline = True
+
+    assert stub_registry.get_chemical("glycerol").formula == "C3H8O3"
+    with pytest.raises(ValueError, match="not found"):
+        stub_registry.get_chemical("water")
+    assert stub_registry.pubchem.lookups == []
+
+
+def test_bundled_snapshot():
+    water = ChemicalSnapshot().get("water")
+
+    assert water.formula == "H2O"
+    assert ChemicalSnapshot().get("water") is not water
+    assert "unobtainium" not in ChemicalSnapshot()
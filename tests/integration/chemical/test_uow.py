@@ -1,7 +1,14 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import inspect
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 
 from graphmix.chemistry.service_layer.unit_of_work import ChemicalUnitOfWork
+from graphmix.chemistry.service_layer.unit_of_work import session_factory
 from graphmix.chemistry.units import Q_
 
 
@@ -30,3 +37,133 @@ def test_chemical_uow_can_retrieve_a_chemical(sqlite_session_factory):
         assert chemical.name == "Water"
         assert chemical.formula == "H2O"
         assert chemical.molar_mass == Q_("18.01528 g/mol")
+
+
+def test_session_factory_configures_sqlite(tmp_path):
+    factory = session_factory(tmp_path / "chemicals.db")
+
+    with factory() as session:
+        engine = session.get_bind()
+        journal_mode = session.execute(text("PRAGMA journal_mode")).scalar()
+        busy_timeout = session.execute(text("PRAGMA busy_timeout")).scalar()
+    indexes = {
+        index["name"]: index["unique"]
+        for index in inspect(engine).get_indexes("chemical")
+    }
+
+    assert journal_mode == "wal"
+    assert busy_timeout == 30_000
+    assert indexes == {
+        "ix_chemical_name": 1,
+        "ix_chemical_formula": 0,
+        "ix_chemical_smiles": 0,
+    }
+
+
+def test_chemical_names_are_unique(tmp_path):
+    factory = session_factory(tmp_path / "chemicals.db")
+
+    with factory() as session:
+        insert_chemical(session, "water", "H2O", "18.015 g/mol")
+        with pytest.raises(IntegrityError):
+            insert_chemical(session, "water", "H2O", "18.015 g/mol")
+
+
+def test_session_factory_indexes_existing_database(tmp_path):
+    path = tmp_path / "chemicals.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE chemical (id INTEGER PRIMARY KEY, name VARCHAR, "
+            "formula VARCHAR, smiles VARCHAR, molar_mass VARCHAR(255))"
+        )
+    connection.close()
+
+    factory = session_factory(path)
+
+    with factory() as session:
+        names = {
+            index["name"]
+            for index in inspect(session.get_bind()).get_indexes("chemical")
+        }
+    assert "ix_chemical_name" in names
+
+
+def legacy_db(path, rows):
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE chemical (id INTEGER PRIMARY KEY, name VARCHAR, "
+            "formula VARCHAR, smiles VARCHAR, molar_mass VARCHAR(255))"
+        )
+        connection.executemany(
+            "INSERT INTO chemical (name, formula, molar_mass) VALUES (?, ?, ?)",
+            rows,
+        )
+    connection.close()
+
+
+def test_session_factory_normalizes_legacy_names(tmp_path, caplog):
+    path = tmp_path / "chemicals.db"
+    legacy_db(
+        path,
+        [
+            ("Water", "H2O", "18.015 g/mol"),
+            ("water ", "H2O", "18.015 g/mol"),
+            ("NaCl", "NaCl", "58.44 g/mol"),
+        ],
+    )
+
+    factory = session_factory(path)
+
+    with factory() as session:
+        rows = session.execute(
+            text("SELECT name, molar_mass FROM chemical ORDER BY id")
+        ).all()
+        indexes = {
+            index["name"]: index["unique"]
+            for index in inspect(session.get_bind()).get_indexes("chemical")
+        }
+    assert rows == [("water", "18.015 g/mol"), ("nacl", "58.44 g/mol")]
+    assert indexes["ix_chemical_name"] == 1
+    assert "Dropping chemical 'water ', a copy of 'Water'" in caplog.text
+    assert "Renaming chemical 'NaCl' to 'nacl'" in caplog.text
+
+    caplog.clear()
+    session_factory(path)
+    assert not caplog.text
+
+
+def test_session_factory_refuses_conflicting_legacy_names(tmp_path):
+    path = tmp_path / "chemicals.db"
+    legacy_db(
+        path,
+        [
+            ("Water", "H2O", "18.015 g/mol"),
+            ("water ", "H2O", "18 g/mol"),
+        ],
+    )
+
+    with pytest.raises(ValueError, match="'Water' and 'water ' differ"):
+        session_factory(path)
+
+    with sqlite3.connect(path) as connection:
+        names = connection.execute("SELECT name FROM chemical").fetchall()
+    connection.close()
+    assert names == [("Water",), ("water ",)]
+
+
+def test_chemical_uow_serves_concurrent_readers(tmp_path):
+    factory = session_factory(tmp_path / "chemicals.db")
+    with factory() as session:
+        for i in range(100):
+            insert_chemical(session, f"chemical {i}", "C", "12 g/mol")
+        session.commit()
+
+    def read(i: int) -> str:
+        uow = ChemicalUnitOfWork(factory)
+        with uow:
+            return uow.repo.get_by("name", f"chemical {i}").name
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        names = list(pool.map(read, range(100)))
+
+    assert names == [f"chemical {i}" for i in range(100)]
@@ -6,7 +6,12 @@ from pydantic import BaseModel
 from pydantic import ValidationError
 
 from graphmix.chemistry.units import Q_
+from graphmix.chemistry.units import Dimensionality
+from graphmix.chemistry.units import DimQuantity
 from graphmix.chemistry.units import Volume
+from graphmix.chemistry.units import _create_registry
+from graphmix.chemistry.units import dimensionality_validator
+from graphmix.chemistry.units import parse_quantity
 
 
 def test_quantity_works_with_pydantic():
@@ -70,3 +75,35 @@ def test_quantity_with_enforced_dimensionality():
 
     for m, v, e in iter_tuple_with_arguments(checks_to_run, 3):
         assert_model(m, v, e)
+
+
+def test_validators_are_cached():
+    assert dimensionality_validator(
+        Dimensionality.Volume, "mL"
+    ) is dimensionality_validator(Dimensionality.Volume, "mL")
+    assert DimQuantity[Dimensionality.Volume, "mL"] is Volume
+
+
+def test_validated_units_are_remembered():
+    class FakeModel(BaseModel):
+        volume: Volume
+
+    for _ in range(2):
+        assert FakeModel(volume=Q_(5, "uL")).volume == Q_(5, "uL")
+        with pytest.raises(ValidationError):
+            FakeModel(volume=Q_(5, "mg"))
+
+
+def test_parse_quantity_returns_new_quantities():
+    first = parse_quantity("100 uL")
+    second = parse_quantity("100 uL")
+    assert first == second
+    assert first is not second
+    first += Q_(1, "uL")
+    assert parse_quantity("100 uL") == Q_(100, "uL")
+
+
+def test_units_cache_is_opt_in(tmp_path):
+    assert _create_registry().cache_folder is None
+    assert _create_registry(str(tmp_path)).cache_folder == tmp_path
+    assert any(tmp_path.iterdir())
@@ -0,0 +1,71 @@
+import math
+
+import networkx as nx
+import pytest
+
+from graphmix.chemistry.units import Q_
+from graphmix.graph.matrix import composition_matrix
+from graphmix.graph.solution import Composition
+from graphmix.graph.solution import DimensionalityError
+
+
+def test_composition_matrix_matches_node_compositions(standard_curve):
+    protocol = standard_curve
+    matrix = protocol.composition_matrix()
+    assert matrix.shape == (len(protocol.nodes), 2)
+
+    for name, node in protocol.nodes.items():
+        for chem in ("NaCl", "H2O"):
+            expected = node.solution.composition.of(chem)
+            actual = matrix.of(name, chem)
+            assert math.isclose(
+                actual.m_as(expected.units), expected.magnitude, abs_tol=1e-9
+            )
+
+    nacl = matrix.column("NaCl")
+    assert nacl.units == Q_(1, "mg/mL").units
+    assert nacl.shape == (len(protocol.nodes),)
+
+
+def test_sparse_composition_matrix(dilution_protocol, diluted_solution_name):
+    matrix = dilution_protocol.composition_matrix(as_sparse=True)
+    assert matrix.of(diluted_solution_name, "NaCl") == Q_(0.5, "mg/mL")
+    assert matrix.of("water", "NaCl") == Q_(0, "mg/mL")
+    assert matrix.to_quantities()["H2O"][0] == Q_(100, "%")
+
+
+def composition(chem, value) -> Composition:
+    # molar solutes only appear in computed compositions, which skip
+    # validation
+    return Composition.model_construct(solutes={chem: value}, solvents={})
+
+
+def mixing_graph() -> nx.DiGraph:
+    G = nx.DiGraph()
+    G.add_edge("molar", "mix", weight=0.5)
+    G.add_edge("mass", "mix", weight=0.5)
+    return G
+
+
+@pytest.mark.parametrize("as_sparse", [False, True])
+def test_composition_matrix_converts_mass_and_molar_columns(nacl, as_sparse):
+    inputs = {
+        "molar": composition(nacl, Q_(1, "M")),
+        "mass": composition(nacl, Q_(58.44, "mg/mL")),
+    }
+
+    matrix = composition_matrix(mixing_graph(), inputs, as_sparse=as_sparse)
+
+    assert matrix.units == (Q_(1, "M").units,)
+    assert math.isclose(matrix.of("mass", "NaCl").m_as("M"), 1)
+    assert math.isclose(matrix.of("mix", "NaCl").m_as("M"), 1)
+
+
+def test_composition_matrix_rejects_incompatible_units(nacl):
+    inputs = {
+        "molar": composition(nacl, Q_(1, "M")),
+        "mass": composition(nacl, Q_(1, "mg")),
+    }
+
+    with pytest.raises(DimensionalityError):
+        composition_matrix(mixing_graph(), inputs)
@@ -1,3 +1,5 @@
+import math
+
 from graphmix.chemistry.units import Q_
 from graphmix.graph.protocol import Protocol
 from graphmix.location import WellPlate
@@ -98,3 +100,167 @@ def test_protocol_initial_volume(dilution_protocol):
     assert protocol.initial_volumes["saline"] == Q_(150, "uL")
     assert protocol.initial_volumes["water"] == Q_(150, "uL")
     assert protocol.initial_volumes["saline_diluted_with_water"] == Q_(0, "uL")
+
+
+def test_solve_methods_agree(standard_curve):
+    protocol = standard_curve.solve(method="quantity")
+    initial = {
+        name: volume.m_as("uL")
+        for name, volume in protocol.initial_volumes.items()
+    }
+    edges = {
+        edge: protocol.edges[edge]["volume"].m_as("uL")
+        for edge in protocol.edges
+    }
+
+    protocol.solve(method="magnitude")
+
+    for name in protocol.nodes:
+        assert math.isclose(
+            protocol.initial_volumes[name].m_as("uL"), initial[name]
+        )
+    for edge in protocol.edges:
+        assert math.isclose(
+            protocol.edges[edge]["volume"].m_as("uL"), edges[edge]
+        )
+
+
+def test_solve_is_idempotent(dilution_protocol):
+    for method in ("quantity", "magnitude"):
+        protocol = dilution_protocol.solve(method=method).solve(method=method)
+        assert protocol.initial_volumes["saline"] == Q_(150, "uL")
+        assert protocol.outgoing_volumes["water"] == Q_(50, "uL")
+
+
+def test_incremental_solve_matches_full_solve(standard_curve):
+    protocol = standard_curve.solve().with_node_from(
+        name="extra",
+        components={"BCA_C": Q_(25, "%"), "water": Q_(75, "%")},
+        into="0",
+        final_volume=Q_(80, "uL"),
+    )
+    protocol.solve()
+    volumes = {
+        attr: {
+            name: volume.m_as("uL")
+            for name, volume in getattr(protocol, attr).items()
+        }
+        for attr in ("initial_volumes", "outgoing_volumes")
+    }
+    edges = {
+        edge: protocol.edges[edge]["volume"].m_as("uL")
+        for edge in protocol.edges
+    }
+
+    # the quantity method always recomputes every volume
+    protocol.solve(method="quantity")
+
+    for name in protocol.nodes:
+        for attr in ("initial_volumes", "outgoing_volumes"):
+            assert math.isclose(
+                getattr(protocol, attr)[name].m_as("uL"),
+                volumes[attr][name],
+                abs_tol=1e-9,
+            )
+    for edge in protocol.edges:
+        assert math.isclose(
+            protocol.edges[edge]["volume"].m_as("uL"), edges[edge]
+        )
+
+
+def test_with_nodes_from(saline, water):
+    records = [
+        {
+            "name": f"mix_{i}",
+            "components": {
+                "saline": Q_(10 * i, "%"),
+                "water": Q_(100 - 10 * i, "%"),
+            },
+            "final_volume": "100 uL",
+        }
+        for i in range(1, 10)
+    ]
+    records.append(
+        {
+            "name": "mix_of_mixes",
+            "components": {"mix_2": "50 %", "mix_4": "50 %"},
+            "final_volume": "50 uL",
+        }
+    )
+    protocol = (
+        Protocol(grids={"0": WellPlate[96]})
+        .with_node(entity=saline, into="0", volume=Q_(100, "uL"))
+        .with_node(entity=water, into="0", volume=Q_(100, "uL"))
+        .with_nodes_from(records, into="0")
+    )
+
+    assert len(protocol.nodes) == 12
+    assert len(protocol.edges) == 20
+    assert protocol.nodes["mix_1"].location == WellPlate[96][2]
+    assert protocol.nodes["mix_9"].location == WellPlate[96][10]
+    assert protocol.nodes["mix_5"]["NaCl"] == Q_(0.5, "mg/mL")
+    assert math.isclose(
+        protocol.nodes["mix_of_mixes"]["NaCl"].m_as("mg/mL"), 0.3
+    )
+
+    protocol.solve()
+    assert protocol.edges["mix_2", "mix_of_mixes"]["volume"] == Q_(25, "uL")
+
+
+def test_intermediate_dilutions(saline, water):
+    protocol = (
+        Protocol(grids={"0": WellPlate[96]})
+        .with_node(entity=saline, into="0", volume=Q_(100, "uL"))
+        .with_node(entity=water, into="0", volume=Q_(100, "uL"))
+        .with_node_from(
+            name="trace",
+            components={"saline": Q_(0.1, "%"), "water": Q_(99.9, "%")},
+            into="0",
+            final_volume=Q_(100, "uL"),
+        )
+        .with_intermediate_dilutions(
+            min_volume=Q_(10, "uL"), into="0", max_volume=Q_(300, "uL")
+        )
+    )
+
+    assert len(protocol.nodes) > 3
+    assert ("saline", "trace") not in protocol.edges
+    for edge in protocol.edges:
+        assert protocol.edges[edge]["volume"].m_as("uL") >= 10 - 1e-9
+    composition = protocol.composition_matrix()
+    assert math.isclose(
+        composition.of("trace", "NaCl").m_as("mg/mL"), 0.001, rel_tol=1e-9
+    )
+
+
+def test_intermediate_dilutions_of_nearly_equal_ratios(saline, water):
+    protocol = (
+        Protocol(grids={"0": WellPlate[96]})
+        .with_node(entity=saline, into="0", volume=Q_(100, "uL"))
+        .with_node(entity=water, into="0", volume=Q_(100, "uL"))
+        .with_nodes_from(
+            (
+                {
+                    "name": name,
+                    "components": {
+                        "saline": Q_(percent, "%"),
+                        "water": Q_(100 - percent, "%"),
+                    },
+                    "final_volume": Q_(100, "uL"),
+                }
+                for name, percent in (("high", 4.561), ("low", 4.558))
+            ),
+            into="0",
+        )
+        .with_intermediate_dilutions(
+            min_volume=Q_(10, "uL"), into="0", max_volume=Q_(300, "uL")
+        )
+    )
+
+    composition = protocol.composition_matrix()
+    for name, concentration in (("high", 0.04561), ("low", 0.04558)):
+        assert math.isclose(
+            composition.of(name, "NaCl").m_as("mg/mL"),
+            concentration,
+            rel_tol=1e-9,
+        )
@@ -1,3 +1,4 @@
+import gc
 import json
 
 import pytest
@@ -38,7 +39,9 @@ def test_solution_prepared_from_solution(saline, h2o, nacl):
     )
 
     assert new_solution.composition == expected_composition
-    assert len(new_solution.G.nodes) == 4
+    assert len(new_solution.G.nodes) == 3
+    assert len(new_solution.mixing_graph.nodes) == 4
+    assert new_solution.components["saline"] is solution
 
     another_dilution = (
         Solution(name="twice_diluted_saline")
@@ -78,3 +81,60 @@ def test_dilute_with(saline, water):
     new_soln = saline.dilute_with(water, 0.5)
     assert new_soln.composition.of("H2O") == Q_(100, "%")
     assert new_soln.composition.of("NaCl") == Q_(0.5, "mg/mL")
+
+
+def test_composition_is_cached_until_components_change(saline, h2o, nacl):
+    diluted = saline.dilute_with(h2o, 0.5)
+    first = diluted.composition
+    assert diluted.composition is first
+
+    saline.with_component(nacl, Q_(2, "mg/mL"))
+    assert saline.composition is not None
+    assert diluted._composition is None
+
+    diluted.with_component(h2o, Q_(50, "%"))
+    assert diluted.composition is not first
+
+
+def test_solutions_do_not_keep_their_dilutions_alive(saline, h2o):
+    dilutions = [saline.dilute_with(h2o, 0.5, name=f"d{i}") for i in range(3)]
+    assert len(saline._dependents) == 3
+
+    del dilutions
+    gc.collect()
+
+    assert len(saline._dependents) == 0
+
+
+def test_composition_of_solutions_sharing_sub_solutions(saline, water, nacl):
+    left, right = saline, water
+    for level in range(25):
+        left, right = (
+            Solution(name=f"left_{level}")
+            .with_component(left, Q_(50, "%"))
+            .with_component(right, Q_(50, "%")),
+            Solution(name=f"right_{level}")
+            .with_component(left, Q_(50, "%"))
+            .with_component(right, Q_(50, "%")),
+        )
+
+    assert left.composition.of(nacl) == Q_(0.5, "mg/mL")
+    assert left.composition.of("H2O") == Q_(100, "%")
+
+
+def test_composition_of_deeply_nested_dilutions(saline, h2o, nacl):
+    solution = saline
+    for level in range(2000):
+        solution = solution.dilute_with(h2o, 0.999, name=f"d{level}")
+
+    composition = solution.composition
+    assert composition.of(nacl).m_as("mg/mL") == pytest.approx(0.999**2000)
+    assert composition.of("H2O").m_as("%") == pytest.approx(100)
+
+
+def test_solution_round_trip_keeps_sub_solutions(saline, water):
+    diluted = saline.dilute_with(water, 0.5)
+    from_json = Solution.model_validate_json(diluted.model_dump_json())
+
+    assert from_json.composition == diluted.composition
+    assert dict(from_json.chemicals).keys() == {"NaCl", "H2O"}
@@ -0,0 +1,125 @@
+import unittest
+
+import pytest
+
+from graphmix.chemistry.units import Q_
+from graphmix.liquid_handling.compiler import compile_protocol
+from graphmix.liquid_handling.compiler import compile_requests
+from graphmix.liquid_handling.liquid_handler import ChannelTransferRequest
+from graphmix.liquid_handling.liquid_handler import MockLiquidHandler
+from graphmix.liquid_handling.program import Instruction
+from graphmix.liquid_handling.program import Opcode
+from graphmix.liquid_handling.program import Program
+from graphmix.liquid_handling.scheduler import TransferScheduler
+from graphmix.liquid_handling.scheduler import split_transfers
+from graphmix.location import LocationSet
+
+
+def tips() -> LocationSet:
+    return LocationSet(name="tips", n_rows=8, n_columns=12)
+
+
+class RateRecordingHandler(MockLiquidHandler):
+    """Records the rate and air cushion of every aspirate and dispense."""
+
+    async def _aspirate(self, volume, location, air_cushion=None, rate=None):
+        self.called.append(("_aspirate", rate, air_cushion))
+
+    async def _dispense(self, volume, location, air_cushion=None, rate=None):
+        self.called.append(("_dispense", rate, air_cushion))
+
+
+class TestCompiler(unittest.IsolatedAsyncioTestCase):
+    @pytest.fixture(autouse=True)
+    def _protocol(self, standard_curve):
+        self.protocol = standard_curve.solve()
+
+    def setUp(self):
+        self.program = compile_protocol(
+            self.protocol, tips(), max_transfer_volume=Q_(200, "uL")
+        )
+        self.requests = split_transfers(
+            TransferScheduler(self.protocol).schedule(), Q_(200, "uL")
+        )
+
+    def test_instructions(self):
+        ops = [instruction.op for instruction in self.program.instructions]
+        assert ops.count(Opcode.Aspirate) == len(self.requests)
+        assert ops.count(Opcode.Dispense) == len(self.requests)
+        assert ops.count(Opcode.PickUpTip) == ops.count(Opcode.DropTip)
+        assert ops[-1] == Opcode.DropTip
+        assert self.program.grids == ["tips", None]
+
+        first = self.requests[0]
+        aspirate = self.program.instructions[1]
+        row, column = first.source.location.xy
+        assert (aspirate.grid, aspirate.row, aspirate.column) == (
+            1,
+            row,
+            column,
+        )
+        assert aspirate.volume == first.volume.m_as("uL")
+
+    def test_json_round_trip(self):
+        loaded = Program.model_validate_json(self.program.model_dump_json())
+        assert loaded.instructions == self.program.instructions
+        assert loaded.grids == self.program.grids
+
+    def test_check_volumes(self):
+        with pytest.raises(ValueError, match="outside"):
+            self.program.check_volumes(Q_(50, "uL"), Q_(200, "uL"))
+
+    async def test_run_program_matches_requests(self):
+        by_requests = MockLiquidHandler(
+            tips=tips(),
+            max_transfer_volume=Q_(200, "uL"),
+            min_transfer_volume=Q_(1, "uL"),
+        )
+        await by_requests.run(self.requests)
+        by_program = MockLiquidHandler(
+            tips=tips(),
+            max_transfer_volume=Q_(200, "uL"),
+            min_transfer_volume=Q_(1, "uL"),
+        )
+        await by_program.run_program(self.program)
+
+        for primitive in ("_pick_up_tip", "_aspirate", "_dispense"):
+            assert by_program.called.count(primitive) == (
+                by_requests.called.count(primitive)
+            )
+        assert not by_program.has_tip
+
+    def test_channel_requests_are_expanded(self):
+        channel_request = ChannelTransferRequest(
+            transfers=tuple(self.requests[:2]),
+            channels=(0, 1),
+        )
+        expanded = compile_requests(self.requests[:2], tips())
+        program = compile_requests([channel_request], tips())
+        assert program.instructions == expanded.instructions
+
+    async def test_run_program_carries_air_cushion_and_default_rates(self):
+        cushioned = self.requests[0].model_copy(
+            update={"air_cushion": Q_(5, "uL")}
+        )
+        program = compile_requests([cushioned], tips())
+        assert [i.air_cushion for i in program.instructions[1:3]] == [5, 5]
+        program.instructions.append(
+            Instruction(Opcode.Mix, 1, 0, 0, volume=20.0, rounds=1)
+        )
+
+        handler = RateRecordingHandler(
+            tips=tips(),
+            max_transfer_volume=Q_(200, "uL"),
+            min_transfer_volume=Q_(1, "uL"),
+            aspiration_rate=Q_(10, "uL/s"),
+            dispense_rate=Q_(20, "uL/s"),
+        )
+        await handler.run_program(program)
+        pipetting = [c for c in handler.called if isinstance(c, tuple)]
+        assert pipetting == [
+            ("_aspirate", Q_(10, "uL/s"), Q_(5, "uL")),
+            ("_dispense", Q_(20, "uL/s"), Q_(5, "uL")),
+            ("_aspirate", Q_(10, "uL/s"), None),
+            ("_dispense", Q_(20, "uL/s"), None),
+        ]
@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+
+import pytest
+
+from graphmix.chemistry.units import Q_
+from graphmix.chemistry.units import FlowRate
+from graphmix.chemistry.units import Volume
+from graphmix.liquid_handling.executor import ConcurrentExecutor
+from graphmix.liquid_handling.executor import dependencies
+from graphmix.liquid_handling.liquid_handler import MockLiquidHandler
+from graphmix.liquid_handling.liquid_handler import TransferRequest
+from graphmix.liquid_handling.scheduler import TransferScheduler
+from graphmix.location import Location
+from graphmix.location import LocationSet
+
+
+class SlowLiquidHandler(MockLiquidHandler):
+    """Mock handler that yields to the event loop while dispensing."""
+
+    def __init__(self, log: list, **kwargs):
+        super().__init__(**kwargs)
+        self.log = log
+
+    async def _dispense(
+        self,
+        volume: Volume,
+        location: Location,
+        air_cushion: Volume | None = None,
+        rate: FlowRate | None = None,
+    ):
+        await asyncio.sleep(0)
+        await super()._dispense(volume, location, air_cushion, rate)
+
+    async def _finish_transfer(self, request: TransferRequest):
+        await super()._finish_transfer(request)
+        self.log.append(request)
+
+
+class TestConcurrentExecutor(unittest.IsolatedAsyncioTestCase):
+    @pytest.fixture(autouse=True)
+    def _protocol(self, standard_curve):
+        self.protocol = standard_curve.solve()
+
+    def setUp(self):
+        self.log = []
+        self.handlers = [
+            SlowLiquidHandler(
+                self.log,
+                tips=LocationSet(name=f"tips_{i}", n_rows=12, n_columns=8),
+                max_transfer_volume=Q_(1000, "uL"),
+                min_transfer_volume=Q_(1, "uL"),
+            )
+            for i in range(2)
+        ]
+
+    def test_dependencies(self):
+        requests = TransferScheduler(self.protocol).schedule()
+        for request, deps in zip(
+            requests, dependencies(requests), strict=True
+        ):
+            into_source = {
+                j
+                for j, r in enumerate(requests)
+                if r.destination.name == request.source.name
+            }
+            assert deps == into_source
+
+    async def test_runs_every_transfer_after_its_inputs(self):
+        requests = TransferScheduler(self.protocol).schedule()
+        await ConcurrentExecutor(self.handlers).run(requests)
+
+        assert len(self.log) == len(requests)
+        assert all(handler.transfers for handler in self.handlers)
+        dispensed = set()
+        for request in self.log:
+            for u, _ in self.protocol.G.in_edges(request.source.name):
+                edge = self.protocol.edges[u, request.source.name]
+                if edge["volume"].magnitude > 0:
+                    assert (u, request.source.name) in dispensed
+            dispensed.add((request.source.name, request.destination.name))
+        for handler in self.handlers:
+            assert not handler.has_tip
@@ -5,8 +5,10 @@ from graphmix import Q_
 from graphmix import Solution
 from graphmix.chemistry.chemical import Chemical
 from graphmix.graph.node import Node
+from graphmix.liquid_handling.liquid_handler import ChannelTransferRequest
 from graphmix.liquid_handling.liquid_handler import MockLiquidHandler
 from graphmix.liquid_handling.liquid_handler import SingleTransferRequest
+from graphmix.liquid_handling.liquid_handler import head96_layout
 from graphmix.location import LocationSet
 
 logging.basicConfig(level=logging.DEBUG)
@@ -97,3 +99,116 @@ class TestLiquidHandler(unittest.IsolatedAsyncioTestCase):
         assert self.handler.called == second_called
 
         assert len(self.handler.transfers) == 2
+
+    def plate_copy(self, source_offset: int = 0) -> ChannelTransferRequest:
+        water = Solution(name="water")
+        source = LocationSet(name="source", n_rows=8, n_columns=13)
+        plate = LocationSet(name="plate", n_rows=8, n_columns=12)
+        transfers = tuple(
+            SingleTransferRequest(
+                source=Node(
+                    solution=water,
+                    location=source[13 * (i // 12) + i % 12 + source_offset],
+                    final_volume=Q_(100, "uL"),
+                ),
+                volume=Q_(50, "uL"),
+                destination=Node(
+                    solution=water,
+                    location=next(plate),
+                    final_volume=Q_(50, "uL"),
+                ),
+            )
+            for i in range(96)
+        )
+        channels = tuple(
+            (i // 12) + 8 * (i % 12) for i in range(len(transfers))
+        )
+        return ChannelTransferRequest(
+            transfers=transfers, channels=channels, head=(8, 12)
+        )
+
+    async def test_single_and_channel_transfers_share_the_rack(self):
+        self.handler.n_channels = 8
+        self.handler.tips = LocationSet(
+            name="tip_rack", n_rows=8, n_columns=12
+        )
+        transfers = self.plate_copy().transfers
+        column = ChannelTransferRequest(
+            transfers=transfers[::12], channels=tuple(range(8))
+        )
+
+        for transfer in transfers[1:13]:
+            await self.handler.transfer(transfer)
+        await self.handler.channel_transfer(column)
+        await self.handler.transfer(transfers[13])
+
+        assert self.handler.called.count("_pick_up_tips") == 1
+        assert self.handler.called.count("_pick_up_tip") == 13
+        # the singles fill column 1 and half of column 2, the channels
+        # take column 3 and the next single goes back to column 2
+        assert len(self.handler.tips) == 96 - 13 - 8
+        assert "tip_rack:E2" not in self.handler.tips
+        assert "tip_rack:F2" in self.handler.tips
+        assert "tip_rack:A3" not in self.handler.tips
+
+    async def test_head96_transfer(self):
+        self.handler.head96 = True
+        self.handler.tips = LocationSet(
+            name="tip_rack", n_rows=8, n_columns=12
+        )
+
+        await self.handler.channel_transfer(self.plate_copy())
+        await self.handler.drop_tip()
+
+        assert self.handler.called == [
+            "_setup_transfer",
+            "_pick_up_tips96",
+            "_aspirate96",
+            "_dispense96",
+            "_finish_transfer",
+            "_drop_tips96",
+        ]
+        assert len(self.handler.tips) == 0
+
+    async def test_shifted_head96_request_uses_channels(self):
+        self.handler.head96 = True
+        self.handler.n_channels = 8
+        self.handler.tips = LocationSet(
+            name="tip_rack", n_rows=8, n_columns=12
+        )
+
+        await self.handler.channel_transfer(self.plate_copy(source_offset=1))
+
+        assert "_pick_up_tips96" not in self.handler.called
+        assert self.handler.called.count("_aspirate_channels") == 12
+
+    async def test_head96_request_without_head96_falls_back(self):
+        await self.handler.channel_transfer(self.plate_copy())
+
+        assert "_pick_up_tips96" not in self.handler.called
+        assert self.handler.called.count("_pick_up_tip") == 96
+        assert self.handler.called.count("_aspirate") == 96
+
+
+def test_head96_layout():
+    plate = LocationSet(name="plate", n_rows=8, n_columns=12)
+    dense = LocationSet(name="dense", n_rows=16, n_columns=24)
+
+    def by_channel(grid: LocationSet, row: int, column: int, step: int):
+        return [
+            grid[
+                (row + step * (c % 8)) * grid.n_columns
+                + column
+                + step * (c // 8)
+            ]
+            for c in range(96)
+        ]
+
+    assert head96_layout(by_channel(plate, 0, 0, 1)) == (0, 0, 1)
+    assert head96_layout(by_channel(dense, 1, 0, 2)) == (1, 0, 2)
+    swapped = by_channel(plate, 0, 0, 1)
+    swapped[8], swapped[9] = swapped[9], swapped[8]
+    assert head96_layout(swapped) is None
+    assert head96_layout([*by_channel(plate, 0, 0, 1)[1:], dense[0]]) is None
+    assert head96_layout(by_channel(plate, 0, 0, 1)[::-1]) is None
+    assert head96_layout(by_channel(plate, 0, 0, 1)[:8]) is None
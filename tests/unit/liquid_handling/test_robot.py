@@ -0,0 +1,141 @@
+import unittest
+
+import pytest
+from pylabrobot.resources import Coordinate
+from pylabrobot.resources import Cos_96_DW_500ul
+from pylabrobot.resources import Cos_384_Sq
+from pylabrobot.resources import Deck
+
+from graphmix.chemistry.units import Q_
+from graphmix.liquid_handling.liquid_handler import Head96Layout
+from graphmix.liquid_handling.robot import Robot
+from graphmix.liquid_handling.robot import create_deck
+from graphmix.liquid_handling.robot import microliters
+from graphmix.location import Location
+from graphmix.location import LocationSet
+
+
+class RecordingHandler:
+    """Stands in for a pylabrobot LiquidHandler and records its calls."""
+
+    def __init__(self, deck: Deck):
+        self.deck = deck
+        self.calls = []
+
+    async def setup(self):
+        pass
+
+    async def pick_up_tips(self, resources, **kwargs):
+        self.calls.append(("pick_up_tips", resources, kwargs))
+
+    async def aspirate(self, resources, **kwargs):
+        self.calls.append(("aspirate", resources, kwargs))
+
+    async def dispense(self, resources, **kwargs):
+        self.calls.append(("dispense", resources, kwargs))
+
+    async def pick_up_tips96(self, tip_rack, **kwargs):
+        self.calls.append(("pick_up_tips96", tip_rack, kwargs))
+
+    async def aspirate_plate(self, plate, **kwargs):
+        self.calls.append(("aspirate_plate", plate, kwargs))
+
+    async def dispense_plate(self, plate, **kwargs):
+        self.calls.append(("dispense_plate", plate, kwargs))
+
+
+class Recording96Handler(RecordingHandler):
+    """A handler with the newer ``aspirate96`` API, which takes wells."""
+
+    async def aspirate96(self, resources, **kwargs):
+        self.calls.append(("aspirate96", resources, kwargs))
+
+
+def test_microliters():
+    assert microliters(Q_(0.05, "mL")) == 50
+    assert microliters(Q_(20, "uL")) == 20
+    assert microliters(None) is None
+
+
+class TestRobot(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        grids = {
+            "tip_rack": LocationSet(name="tip_rack", n_rows=12, n_columns=8),
+            "plate": LocationSet(name="plate", n_rows=8, n_columns=12),
+        }
+        self.deck = create_deck(grids, "tip_rack")
+        self.robot = Robot(
+            handler=RecordingHandler(self.deck),
+            tips=grids["tip_rack"],
+        )
+        await self.robot.setup()
+
+    async def test_resolved_wells_are_cached(self):
+        await self.robot._pick_up_tip(Location.from_str("A1"))
+        for _ in range(2):
+            await self.robot._aspirate(
+                Q_(50, "uL"), Location.from_str("plate:A1")
+            )
+            await self.robot._dispense(
+                Q_(50, "uL"), Location.from_str("plate:B1")
+            )
+        assert set(self.robot._resolved) == {
+            ("tip_rack", 0, 0),
+            ("plate", 0, 0),
+            ("plate", 1, 0),
+        }
+        well = self.deck.get_resource("plate")["B1"][0]
+        _, resources, kwargs = self.robot.handler.calls[-1]
+        assert resources == [well]
+        assert kwargs["vols"] == 50
+
+    async def test_deck_change_invalidates_cache(self):
+        await self.robot._pick_up_tip(Location.from_str("A1"))
+        assert self.robot._resolved
+        self.deck.assign_child_resource(
+            Cos_96_DW_500ul(name="extra"), location=Coordinate(400, 0, 0)
+        )
+        assert not self.robot._resolved
+
+    async def test_head96_uses_the_96_api(self):
+        await self.robot._pick_up_tips96("tip_rack")
+        await self.robot._aspirate96(
+            Q_(50, "uL"), "plate", rate=Q_(6, "mL/min")
+        )
+        names = [name for name, _, _ in self.robot.handler.calls]
+        assert names == ["pick_up_tips96", "aspirate_plate"]
+        _, tip_rack, _ = self.robot.handler.calls[0]
+        assert tip_rack is self.deck.get_resource("tip_rack")
+        _, plate, kwargs = self.robot.handler.calls[1]
+        assert plate is self.deck.get_resource("plate")
+        assert kwargs == {"volume": 50, "flow_rate": 100}
+
+    async def test_head96_quadrant_of_a_384_well_plate(self):
+        self.deck.assign_child_resource(
+            Cos_384_Sq(name="dense"), location=Coordinate(400, 0, 0)
+        )
+        self.robot.handler = Recording96Handler(self.deck)
+        await self.robot._aspirate96(
+            Q_(50, "uL"), "dense", layout=Head96Layout(1, 0, 2)
+        )
+        _, wells, _ = self.robot.handler.calls[0]
+        dense = self.deck.get_resource("dense")
+        assert len(wells) == 96
+        assert wells[:2] == [dense["B1"][0], dense["D1"][0]]
+        assert wells[8] is dense["B3"][0]
+        assert wells[-1] is dense["P23"][0]
+
+    async def test_head96_quadrant_needs_the_96_api(self):
+        self.deck.assign_child_resource(
+            Cos_384_Sq(name="dense"), location=Coordinate(400, 0, 0)
+        )
+        with pytest.raises(NotImplementedError):
+            await self.robot._aspirate96(
+                Q_(50, "uL"), "dense", layout=Head96Layout(0, 1, 2)
+            )
+
+    async def test_head96_layout_must_match_the_plate(self):
+        with pytest.raises(ValueError, match="do not line up"):
+            await self.robot._aspirate96(
+                Q_(50, "uL"), "plate", layout=Head96Layout(0, 0, 2)
+            )
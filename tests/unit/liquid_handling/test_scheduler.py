@@ -0,0 +1,235 @@
+import unittest
+
+import pytest
+
+from graphmix.chemistry.units import Q_
+from graphmix.graph.protocol import Protocol
+from graphmix.graph.solution import Solution
+from graphmix.liquid_handling.liquid_handler import ChannelTransferRequest
+from graphmix.liquid_handling.liquid_handler import MockLiquidHandler
+from graphmix.liquid_handling.liquid_handler import MultiTransferRequest
+from graphmix.liquid_handling.scheduler import TransferScheduler
+from graphmix.liquid_handling.scheduler import consolidate
+from graphmix.liquid_handling.scheduler import consolidate_protocol
+from graphmix.liquid_handling.scheduler import plan_channels
+from graphmix.liquid_handling.scheduler import source_overhead
+from graphmix.liquid_handling.scheduler import split_transfers
+from graphmix.liquid_handling.scheduler import tip_changes
+from graphmix.location import Location
+from graphmix.location import LocationSet
+from graphmix.location import WellPlate
+
+
+def plate_protocol(saline: Solution, water: Solution, n: int) -> Protocol:
+    return (
+        Protocol(grids={"stock": WellPlate[6], "plate": WellPlate[96]})
+        .with_node(entity=saline, into="stock", volume=Q_(100, "uL"))
+        .with_node(entity=water, into="stock", volume=Q_(100, "uL"))
+        .with_nodes_from(
+            (
+                {
+                    "name": f"well_{i}",
+                    "components": {"saline": "50 %", "water": "50 %"},
+                    "final_volume": "100 uL",
+                }
+                for i in range(n)
+            ),
+            into="plate",
+        )
+        .solve()
+    )
+
+
+def column_copy_protocol(
+    saline: Solution, water: Solution, stocks: LocationSet | None = None
+) -> Protocol:
+    """
+    Copy eight stocks, one per row of ``stocks``'s first column, down a
+    column; with a 384 well ``stocks`` they sit every other row.
+    """
+    if stocks is None:
+        stocks = LocationSet(name="stock", n_rows=8, n_columns=12)
+    spacing = stocks.n_rows // 8
+    protocol = Protocol(
+        grids={
+            "stock": stocks,
+            "plate": LocationSet(name="plate", n_rows=8, n_columns=1),
+        }
+    ).with_node(
+        entity=water,
+        into=Location.from_str("stock:A12"),
+        volume=Q_(1000, "uL"),
+    )
+    for row in range(8):
+        stock = saline.model_copy(update={"name": f"stock_{row}"})
+        protocol = protocol.with_node(
+            entity=stock,
+            into=stocks[row * spacing * stocks.n_columns],
+            volume=Q_(100, "uL"),
+        ).with_node_from(
+            name=f"well_{row}",
+            components={stock: Q_(50, "%"), "water": Q_(50, "%")},
+            into="plate",
+            final_volume=Q_(100, "uL"),
+        )
+    return protocol.solve()
+
+
+class TestTransferScheduler(unittest.IsolatedAsyncioTestCase):
+    @pytest.fixture(autouse=True)
+    def _protocols(self, saline, water, standard_curve):
+        self.saline = saline
+        self.water = water
+        self.protocol = standard_curve.solve()
+
+    def setUp(self):
+        self.handler = MockLiquidHandler(
+            tips=LocationSet(name="tip_rack", n_rows=12, n_columns=8),
+            max_transfer_volume=Q_(1000, "uL"),
+            min_transfer_volume=Q_(1, "uL"),
+        )
+
+    def test_schedule_covers_every_transfer_after_its_inputs(self):
+        requests = TransferScheduler(self.protocol).schedule()
+        transfers = [
+            edge
+            for edge, data in self.protocol.G.edges.items()
+            if data["volume"].magnitude > 0
+        ]
+        assert len(requests) == len(transfers)
+
+        done = set()
+        for request in requests:
+            for u, _ in self.protocol.G.in_edges(request.source.name):
+                assert (u, request.source.name) in done
+            done.add((request.source.name, request.destination.name))
+
+    async def test_schedule_reuses_tips_per_source(self):
+        requests = TransferScheduler(self.protocol).schedule()
+        sources = {request.source.name for request in requests}
+        assert tip_changes(requests) == len(sources)
+
+        # a tip that dispensed into saline is not reused for water
+        await self.handler.run(requests)
+        assert self.handler.called.count("_pick_up_tip") > len(sources)
+
+        self.handler.called.clear()
+        self.handler.reuse_source_tips = True
+        await self.handler.run(requests)
+        assert self.handler.called.count("_pick_up_tip") == len(sources)
+        assert self.handler.called[-1] == "_drop_tip"
+
+    async def test_consolidated_plate_uses_multi_dispense(self):
+        requests = consolidate(
+            TransferScheduler(
+                plate_protocol(self.saline, self.water, 12)
+            ).schedule(),
+            max_transfer_volume=Q_(200, "uL"),
+            excess_volume=Q_(10, "uL"),
+        )
+        assert len(requests) == 8
+        for request in requests:
+            assert isinstance(request, MultiTransferRequest)
+            assert len(request.destinations) == 3
+            assert request.aspirate_volume == Q_(160, "uL")
+        assert source_overhead(requests) == {
+            "saline": Q_(40, "uL"),
+            "water": Q_(40, "uL"),
+        }
+
+        self.handler.reuse_source_tips = True
+        await self.handler.run(requests)
+        assert self.handler.called.count("_aspirate") == 8
+        assert self.handler.called.count("_dispense") == 24
+        assert self.handler.called.count("_pick_up_tip") == 2
+
+    def test_consolidation_reserves_source_overhead(self):
+        protocol = plate_protocol(self.saline, self.water, 12)
+        before = protocol.initial_volumes["saline"]
+
+        requests = consolidate_protocol(
+            protocol,
+            max_transfer_volume=Q_(200, "uL"),
+            excess_volume=Q_(10, "uL"),
+        )
+
+        assert protocol.overheads["saline"] == Q_(40, "uL")
+        assert protocol.initial_volumes["saline"] == before + Q_(40, "uL")
+        aspirated = sum(
+            (r.aspirate_volume for r in requests if r.source.name == "saline"),
+            Q_(0, "uL"),
+        )
+        final = protocol.nodes["saline"].final_volume
+        assert aspirated + final == protocol.initial_volumes["saline"]
+
+    async def test_column_aligned_transfers_use_channels(self):
+        protocol = column_copy_protocol(self.saline, self.water)
+        stages = TransferScheduler(protocol).generations()
+        requests = plan_channels(stages, head=(8, 1))
+
+        channel_requests = [
+            r for r in requests if isinstance(r, ChannelTransferRequest)
+        ]
+        assert len(channel_requests) == 1
+        assert channel_requests[0].channels == tuple(range(8))
+        assert len(requests) == 9
+
+        self.handler.n_channels = 8
+        self.handler.tips = LocationSet(name="tips", n_rows=8, n_columns=12)
+        await self.handler.run(requests)
+        assert self.handler.called.count("_aspirate_channels") == 1
+        assert self.handler.called.count("_aspirate") == 8
+
+    async def test_channels_follow_plate_pitch(self):
+        stock = WellPlate[384].with_name("stock")
+        protocol = column_copy_protocol(self.saline, self.water, stock)
+        stages = list(TransferScheduler(protocol).generations())
+
+        # channels 9 mm apart reach every other row of a 4.5 mm plate
+        requests = plan_channels(stages, grids=protocol.grids)
+        channel_requests = [
+            r for r in requests if isinstance(r, ChannelTransferRequest)
+        ]
+        assert len(channel_requests) == 1
+        assert channel_requests[0].channels == tuple(range(8))
+
+        # stocks in neighbouring rows of a 4.5 mm plate are out of reach
+        protocol = column_copy_protocol(self.saline, self.water)
+        stages = list(TransferScheduler(protocol).generations())
+        packed = protocol.grids["stock"].with_pitch(4.5)
+        requests = plan_channels(stages, grids={"stock": packed})
+        assert not any(isinstance(r, ChannelTransferRequest) for r in requests)
+
+    async def test_mixed_transfers_stay_single_channel(self):
+        protocol = column_copy_protocol(self.saline, self.water)
+        stages = [
+            [r.model_copy(update={"air_cushion": Q_(5, "uL")}) for r in stage]
+            for stage in TransferScheduler(protocol).generations()
+        ]
+        requests = plan_channels(stages)
+        assert not any(isinstance(r, ChannelTransferRequest) for r in requests)
+
+    async def test_single_channel_handler_falls_back(self):
+        requests = plan_channels(
+            TransferScheduler(
+                column_copy_protocol(self.saline, self.water)
+            ).generations()
+        )
+        await self.handler.run(requests)
+        assert "_aspirate_channels" not in self.handler.called
+        assert self.handler.called.count("_aspirate") == 16
+
+    async def test_oversized_transfers_are_split(self):
+        requests = TransferScheduler(
+            plate_protocol(self.saline, self.water, 2)
+        ).schedule()
+        split = split_transfers(requests, max_transfer_volume=Q_(20, "uL"))
+        assert len(split) == 3 * len(requests)
+        assert all(r.volume == Q_(50 / 3, "uL") for r in split)
+        assert tip_changes(split) == 2
+
+        self.handler.max_transfer_volume = Q_(20, "uL")
+        self.handler.reuse_source_tips = True
+        await self.handler.run(requests)
+        assert self.handler.called.count("_aspirate") == 12
+        assert self.handler.called.count("_pick_up_tip") == 2
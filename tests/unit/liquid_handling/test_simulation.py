@@ -0,0 +1,115 @@
+import math
+import unittest
+
+import pytest
+
+from graphmix.chemistry.chemical import Chemical
+from graphmix.chemistry.units import Q_
+from graphmix.graph.node import Node
+from graphmix.graph.solution import Solution
+from graphmix.liquid_handling.liquid_handler import SingleTransferRequest
+from graphmix.liquid_handling.scheduler import TransferScheduler
+from graphmix.liquid_handling.scheduler import tip_changes
+from graphmix.liquid_handling.simulation import SimulatedLiquidHandler
+from graphmix.liquid_handling.simulation import TimeModel
+from graphmix.liquid_handling.simulation import simulate
+from graphmix.location import Location
+from graphmix.location import LocationSet
+
+
+def transfer(source: str, destination: str, volume: float, reuse_tip=False):
+    h2o = Chemical(name="H2O", formula="H2O", molar_mass="18.015 g/mol")
+    water = Solution(name="water").with_component(h2o, Q_(100, "%"))
+
+    def node(location: str) -> Node:
+        return Node(
+            solution=water,
+            location=Location.from_str(location),
+            final_volume=Q_(100, "uL"),
+        )
+
+    return SingleTransferRequest(
+        source=node(source),
+        destination=node(destination),
+        volume=Q_(volume, "uL"),
+        reuse_tip=reuse_tip,
+    )
+
+
+class TestSimulatedLiquidHandler(unittest.IsolatedAsyncioTestCase):
+    @pytest.fixture(autouse=True)
+    def _protocol(self, standard_curve):
+        self.protocol = standard_curve.solve()
+
+    def setUp(self):
+        self.time_model = TimeModel(
+            tip_pick_up="4 s",
+            tip_drop="2 s",
+            aspirate_rate="10 uL/s",
+            dispense_rate="20 uL/s",
+            settle="0 s",
+            well_pitch="9 mm",
+            head_speed="9 mm/s",
+            grid_change="5 s",
+        )
+        self.handler = SimulatedLiquidHandler(
+            tips=LocationSet(name="tips", n_rows=8, n_columns=12),
+            max_transfer_volume=Q_(200, "uL"),
+            min_transfer_volume=Q_(1, "uL"),
+            time_model=self.time_model,
+        )
+
+    async def test_report(self):
+        await self.handler.run(
+            [
+                transfer("plate:A1", "plate:A4", 100),
+                transfer("plate:A1", "plate:D4", 50, reuse_tip=True),
+            ]
+        )
+        report = self.handler.report()
+
+        assert report.tips_used == 1
+        assert report.transfers == 2
+        assert report.phases["tip"] == Q_(6, "s")
+        assert report.phases["aspirate"] == Q_(15, "s")
+        assert report.phases["dispense"] == Q_(7.5, "s")
+        # home -> tip rack -> A1 -> A4 -> A1 -> D4
+        assert math.isclose(
+            report.phases["move"].m_as("s"),
+            5 + 5 + 3 + 3 + math.dist((0, 0), (3, 3)),
+        )
+        assert math.isclose(
+            report.runtime.m_as("s"),
+            sum(p.m_as("s") for p in report.phases.values()),
+        )
+
+    async def test_layout_comparison(self):
+        near = [transfer("plate:A1", "plate:A2", 20)]
+        far = [transfer("plate:A1", "plate:H12", 20)]
+
+        await self.handler.run(near)
+        near_runtime = self.handler.report().runtime
+        self.handler.reset()
+        await self.handler.run(far)
+        assert self.handler.report().runtime > near_runtime
+
+    def test_changed_time_model(self):
+        assert self.time_model.seconds("well") == 1
+        self.time_model.head_speed = Q_(18, "mm/s")
+        assert self.time_model.seconds("well") == 0.5
+        faster = self.time_model.model_copy(update={"grid_change": Q_(1, "s")})
+        assert faster.seconds("grid_change") == 1
+
+    async def test_simulate(self):
+        report = await simulate(
+            self.protocol,
+            tips=LocationSet(name="tips", n_rows=8, n_columns=12),
+            max_transfer_volume=Q_(200, "uL"),
+            min_transfer_volume=Q_(1, "uL"),
+            time_model=self.time_model,
+            reuse_source_tips=True,
+        )
+        requests = TransferScheduler(self.protocol).schedule()
+        assert report.transfers == len(requests)
+        assert report.tips_used == tip_changes(requests)
+        assert report.runtime.m_as("s") > 0
@@ -0,0 +1,138 @@
+import asyncio
+import csv
+import json
+import logging
+
+from graphmix.chemistry.chemical import Chemical
+from graphmix.chemistry.units import Q_
+from graphmix.graph.node import Node
+from graphmix.graph.solution import Solution
+from graphmix.liquid_handling.liquid_handler import ChannelTransferRequest
+from graphmix.liquid_handling.liquid_handler import MockLiquidHandler
+from graphmix.liquid_handling.liquid_handler import SingleTransferRequest
+from graphmix.liquid_handling.trace import EventBuffer
+from graphmix.liquid_handling.trace import Tracer
+from graphmix.location import LocationSet
+
+
+def run_transfer(handler: MockLiquidHandler):
+    h2o = Chemical(name="H2O", formula="H2O", molar_mass="18.015 g/mol")
+    water = Solution(name="water").with_component(h2o, Q_(100, "%"))
+    plate = LocationSet(name="plate", n_rows=8, n_columns=12)
+    source, destination = (
+        Node(solution=water, location=next(plate), final_volume=Q_(1, "mL"))
+        for _ in range(2)
+    )
+    request = SingleTransferRequest(
+        source=source, destination=destination, volume=Q_(50, "uL")
+    )
+    asyncio.run(handler.run([request]))
+
+
+def mock_handler(n_channels: int = 1) -> MockLiquidHandler:
+    return MockLiquidHandler(
+        tips=LocationSet(name="tips", n_rows=8, n_columns=12),
+        max_transfer_volume=Q_(200, "uL"),
+        min_transfer_volume=Q_(1, "uL"),
+        logger=logging.getLogger("graphmix.test_trace"),
+        n_channels=n_channels,
+    )
+
+
+def traced_run() -> Tracer:
+    handler = mock_handler()
+    handler.tracer = Tracer(name="deck")
+    run_transfer(handler)
+    return handler.tracer
+
+
+def test_spans():
+    spans = traced_run().spans
+    assert [span.name for span in spans] == [
+        "pick_up_tip",
+        "aspirate",
+        "dispense",
+        "transfer",
+        "drop_tip",
+    ]
+    transfer = spans[3]
+    for span in spans[:3]:
+        assert transfer.start <= span.start <= span.end <= transfer.end
+    assert not spans[0].args["has_tip"]
+    assert spans[1].args["has_tip"]
+    assert spans[1].args["volume"] == Q_(50, "uL")
+
+
+def test_channel_transfer_span():
+    h2o = Chemical(name="H2O", formula="H2O", molar_mass="18.015 g/mol")
+    water = Solution(name="water").with_component(h2o, Q_(100, "%"))
+    plate = LocationSet(name="plate", n_rows=8, n_columns=12)
+    transfers = tuple(
+        SingleTransferRequest(
+            source=Node(
+                solution=water, location=next(plate), final_volume=Q_(1, "mL")
+            ),
+            destination=Node(
+                solution=water, location=next(plate), final_volume=Q_(1, "mL")
+            ),
+            volume=Q_(50, "uL"),
+        )
+        for _ in range(2)
+    )
+    handler = mock_handler(n_channels=8)
+    handler.tracer = Tracer(name="deck")
+    asyncio.run(
+        handler.channel_transfer(
+            ChannelTransferRequest(transfers=transfers, channels=(0, 1))
+        )
+    )
+
+    spans = handler.tracer.spans
+    assert [span.name for span in spans] == ["channel_transfer"]
+    span = spans[-1]
+    assert span.args["channels"] == (0, 1)
+    assert span.args["volumes"] == [Q_(50, "uL")] * 2
+    assert [str(location) for location in span.args["sources"]] == [
+        "A1",
+        "A3",
+    ]
+
+
+def test_export(tmp_path):
+    tracer = traced_run()
+    tracer.write_chrome_trace(tmp_path / "trace.json")
+    tracer.write_csv(tmp_path / "trace.csv")
+
+    with (tmp_path / "trace.json").open() as f:
+        events = json.load(f)["traceEvents"]
+    assert len(events) == 5
+    assert events[1]["args"] == {
+        "has_tip": True,
+        "volume": 50,
+        "location": "plate:A1",
+    }
+    assert all(event["ph"] == "X" for event in events)
+
+    with (tmp_path / "trace.csv").open() as f:
+        rows = list(csv.DictReader(f))
+    assert rows[3]["name"] == "transfer"
+    assert rows[3]["destination"] == "plate:A2"
+
+
+def test_events_go_to_buffer(caplog):
+    handler = mock_handler()
+    handler.events = EventBuffer(maxlen=3)
+    with caplog.at_level(logging.INFO, logger=handler.logger.name):
+        run_transfer(handler)
+
+    assert not caplog.records
+    assert len(handler.events) == 3
+    assert handler.events.messages()[-1] == "Dropping tip"
+
+
+def test_log_messages(caplog):
+    handler = mock_handler()
+    with caplog.at_level(logging.INFO, logger=handler.logger.name):
+        run_transfer(handler)
+
+    assert "Transferring 50 µl from A1 to A2" in caplog.messages
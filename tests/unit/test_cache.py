@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from graphmix.core.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_cache_entries_expire():
+    clock = Clock()
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 10
+    assert cache.get("a") == 1
+    clock.now = 10.5
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_pop():
+    cache = TTLCache()
+    cache.set("a", 1)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+
+
+def test_cache_is_shared_between_threads():
+    cache = TTLCache(maxsize=8)
+
+    def use(offset: int):
+        for i in range(1000):
+            cache.set((offset + i) % 16, i)
+            cache.get((offset + i + 1) % 16)
+            cache.pop((offset + i + 2) % 16)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(use, range(8)))
+    assert len(cache) <= 8
@@ -0,0 +1,74 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import graphmix
+from graphmix.graph.solution import Solution
+
+HEAVY_MODULES = (
+    "matplotlib",
+    "pylabrobot",
+    "sqlmodel",
+    "requests",
+    "pint",
+    "scipy.sparse",
+)
+
+
+def imported_after(statement: str) -> dict:
+    """Run ``statement`` in a fresh interpreter and report how long it took
+    and which heavy modules it loaded."""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_import_is_lightweight():
+    result = imported_after("import graphmix")
+    assert result["heavy"] == []
+    assert result["elapsed"] < 0.25
+
+
+@pytest.mark.parametrize(
+    ("statement", "forbidden"),
+    [
+        ("from graphmix import Solution", ("matplotlib", "pylabrobot")),
+        ("from graphmix import Q_", ("matplotlib", "pylabrobot", "sqlmodel")),
+        (
+            "import graphmix.graph.protocol",
+            ("matplotlib", "pylabrobot", "scipy.sparse"),
+        ),
+    ],
+)
+def test_exports_only_import_what_they_need(statement, forbidden):
+    heavy = imported_after(statement)["heavy"]
+    assert not set(heavy) & set(forbidden)
+
+
+def test_planning_import_time():
+    # planning loads pint and sqlmodel, but not scipy, which is only
+    # imported once a protocol is solved
+    result = imported_after("import graphmix.graph.protocol")
+    assert "scipy.sparse" not in result["heavy"]
+    assert result["elapsed"] < 3
+
+
+def test_lazy_exports():
+    assert "Solution" in dir(graphmix)
+    assert graphmix.Solution is Solution
+    with pytest.raises(AttributeError):
+        graphmix.missing  # noqa: B018
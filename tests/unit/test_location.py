@@ -2,6 +2,7 @@ import pytest
 
 from graphmix.location import Location
 from graphmix.location import LocationSet
+from graphmix.location import Position
 from graphmix.location import WellPlate
 
 
@@ -66,3 +67,66 @@ def test_location_set_indexing():
     for check in checks:
         with pytest.raises(IndexError):
             _ = well_plate[check]
+
+
+def test_location_set_bulk_reservation():
+    well_plate = WellPlate[96].with_occupied_location("A1")
+    block = well_plate.take(3)
+    assert block == [Location(row="A", column=i) for i in range(2, 5)]
+    assert len(well_plate) == 92
+    assert "A3" not in well_plate
+
+    column = well_plate.take_column()
+    assert column == [Location(row=chr(65 + i), column=5) for i in range(8)]
+    assert len(well_plate) == 84
+    assert next(well_plate) == Location(row="A", column=6)
+
+    well_plate.reset()
+    assert len(well_plate) == 96
+    assert next(well_plate) == Location(row="A", column=1)
+
+
+def test_location_set_exhaustion():
+    well_plate = WellPlate[6]
+    assert len(list(well_plate)) == 6
+    with pytest.raises(ValueError, match="requested locations are free"):
+        well_plate.take(1)
+
+
+def test_positions_are_interned():
+    a1 = Location(row="A", column=1, grid="plate").position
+    assert a1 is Position(0, 0, "plate")
+    assert a1 is not Position(0, 0, "other")
+    assert {a1, Position(0, 0, "plate")} == {a1}
+    assert a1 < Position(0, 1, "plate") < Position(1, 0, "plate")
+    assert a1.to_location() == Location(row="A", column=1)
+    with pytest.raises(AttributeError):
+        a1.row = 1
+
+
+def test_location_ordering_is_numeric():
+    assert Location.from_str("A2") < Location.from_str("A10")
+    assert Location.from_str("B1") > "A12"
+    assert hash(Location.from_str("plate:C3")) == hash(Location.from_str("C3"))
+
+
+def test_location_comparisons_with_other_types():
+    a1 = Location.from_str("plate:A1")
+    assert a1 == "A1"
+    assert a1 != "not a well"
+    assert a1 != 1
+    assert a1 != a1.position
+    assert len({a1, a1.position}) == 2
+    with pytest.raises(TypeError):
+        a1 < 1  # noqa: B015
+    with pytest.raises(TypeError):
+        a1.position < a1  # noqa: B015
+
+
+def test_multi_letter_rows():
+    well_plate = WellPlate[1536]
+    assert len(well_plate) == 1536
+    last = well_plate[1535]
+    assert str(last) == "AF48"
+    assert Location.from_str("AF48").xy == (31, 47)
+    assert well_plate["AF48"] == last